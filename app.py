@@ -1,9 +1,14 @@
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
-import joblib, json, os
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
+import os
+from functools import lru_cache
+from artifacts import load_artifacts, load_fast, model_stamp
+from forest_engine import CompiledForest
+from inference import (PARAM_RANGES, SPREAD_QUANTILES, PredictionCache, SweepPrefetcher,
+                       find_boundaries, predict_contributions, predict_grid, predict_spread,
+                       predict_sweeps, rows_scored)
+import metrics
+from surface_index import SurfaceIndex
 
 st.set_page_config(
     page_title="ForestIQ",
@@ -21,6 +26,14 @@ def go_to(p):
 
 page = st.session_state.page
 
+# Timing spans (metrics.py): opt in with ?debug=1 or FORESTIQ_METRICS
+debug = st.query_params.get("debug") == "1"
+timer = metrics.Timer(enabled=debug or metrics.ENABLED)
+# False once a page fragment has run; fragment-only reruns skip this top part
+full_run = True
+# rows_scored() when this rerun began: cached and prefetched rows are not counted
+rows_at_start = rows_scored()
+
 # ══════════════════════════════════════════════════════════════
 #  STYLES — SegmentIQ Glassmorphism System
 # ══════════════════════════════════════════════════════════════
@@ -353,28 +366,71 @@ COVER_BRDS   = [
 ]
 
 # ── MODEL ──────────────────────────────────────────────────────
+@st.cache_resource(max_entries=1)
+def get_model(stamp=None):
+    return load_artifacts()
+
+# Compiled engine: set FORESTIQ_ENGINE=sklearn to score through the estimator
+@st.cache_resource(max_entries=1)
+def get_engine(stamp, _model, _scaler):
+    if isinstance(_model, CompiledForest):
+        engine = _model
+    elif os.environ.get("FORESTIQ_ENGINE", "compiled") != "compiled":
+        return None
+    else:
+        try:
+            engine = CompiledForest.from_sklearn(_model, _scaler)
+        except ValueError:
+            return None
+    engine.path_index()  # Classify's attributions walk leaves back up; build it with the model
+    return engine
+
+# Precomputed Explore surface (surface_index.py build); None when absent or stale
+@st.cache_resource(max_entries=1)
+def get_surface_index(stamp=None):
+    return SurfaceIndex.open(stamp=stamp)
+
+# Compressed model for Explore sweeps (compress.py); None when absent or stale
+@st.cache_resource(max_entries=1)
+def get_fast_model(stamp=None):
+    return load_fast(stamp)
+
+# One cache per served model: "accurate" for Classify, "fast" for Explore;
+# "grid" holds finished heatmaps (~1 MB each at 200×200), so it stays small
+@st.cache_resource
+def get_prediction_cache(kind="accurate", maxsize=2048):
+    return PredictionCache(maxsize=maxsize)
+
+# Explore sweeps started from Classify; FORESTIQ_PREFETCH_WORKERS bounds the pool for all sessions
+@st.cache_resource
+def get_prefetcher():
+    return SweepPrefetcher(workers=int(os.environ.get("FORESTIQ_PREFETCH_WORKERS", 2)))
+
 @st.cache_resource
-def get_model():
-    if os.path.exists('forest_model.pkl'):
-        model  = joblib.load('forest_model.pkl')
-        scaler = joblib.load('forest_scaler.pkl')
-        with open('forest_features.json') as f:
-            features = json.load(f)
-        return model, scaler, features
-
-    np.random.seed(42); n = 5000; n_feats = 54
-    X    = np.random.randn(n, n_feats)
-    X[:,0] = X[:,0] * 500 + 2500
-    y    = ((X[:,0] - 1800) / 500).astype(int).clip(0, 6)
-    sc   = StandardScaler(); Xs = sc.fit_transform(X)
-    mdl  = RandomForestClassifier(n_estimators=50, random_state=42)
-    mdl.fit(Xs, y)
-    feats = (['Elevation','Aspect','Slope','H_Dist_Hydro','V_Dist_Hydro',
-              'H_Dist_Roads','Hillshade_9am','Hillshade_Noon','Hillshade_3pm','H_Dist_Fire']
-             + [f'Wilderness_{i}' for i in range(4)] + [f'Soil_{i}' for i in range(40)])
-    return mdl, sc, feats
-
-model, scaler, feature_names = get_model()
+def get_metrics():
+    registry = metrics.Registry()
+    if metrics.EXPORT_PORT:
+        registry.serve(metrics.EXPORT_PORT, metrics.EXPORT_HOST)
+    return registry
+
+# Only the pages that predict pay for the model (and for Plotly)
+if page in ("classify", "explore"):
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    with timer.span("get_model"):
+        MODEL_STAMP = model_stamp()
+        model, scaler, feature_names = get_model(MODEL_STAMP)
+        engine = get_engine(MODEL_STAMP, model, scaler)
+        scorer = (engine, None) if engine is not None else (model, scaler)
+        surface = get_surface_index(MODEL_STAMP)
+        prediction_cache = get_prediction_cache()
+        prediction_cache.bind(MODEL_STAMP)
+        fast = get_fast_model(MODEL_STAMP)
+        sweep_scorer = (fast[0], None) if fast is not None else scorer
+        sweep_cache  = get_prediction_cache("fast") if fast is not None else prediction_cache
+        sweep_cache.bind(MODEL_STAMP)
+        grid_cache = get_prediction_cache("grid", 32)
+        grid_cache.bind(MODEL_STAMP)
 
 def CC():
     return dict(
@@ -386,6 +442,81 @@ GRID = 'rgba(255,255,255,0.06)'
 TICK = dict(size=9, family='JetBrains Mono', color='#7C6FA0')
 AX   = dict(size=9, color='#7C6FA0', family='JetBrains Mono')
 
+# ── CHART TEMPLATES ───────────────────────────────────────────
+# Shared styling is one registered template, sent as ~0.5 KB per chart in
+# place of Streamlit's 3.6 KB default. The per-chart layouts are built once;
+# a rerun only swaps in data and the baseline marker.
+if page in ("classify", "explore") and "forestiq" not in pio.templates:
+    _axis = dict(gridcolor=GRID, zeroline=False, tickfont=TICK, title_font=AX, showline=True, linecolor=GRID)
+    pio.templates["forestiq"] = go.layout.Template(layout=dict(**CC(), xaxis=_axis, yaxis=_axis))
+
+HBAR_Y       = dict(gridcolor='rgba(0,0,0,0)', showline=False,
+                    tickfont=dict(size=11, family='JetBrains Mono', color='#B8AED8'))
+PROB_LAYOUT  = dict(template="forestiq", margin=dict(l=0, r=52, t=4, b=4), height=260,
+                    xaxis=dict(range=[0,1.3], tickformat='.0%'), yaxis=HBAR_Y)
+FEAT_LAYOUT  = dict(PROB_LAYOUT, height=220)
+ATTR_LAYOUT  = dict(template="forestiq", margin=dict(l=0, r=16, t=4, b=4), height=300, yaxis=HBAR_Y,
+                    xaxis=dict(title="Δ probability (pts)", zeroline=True, zerolinecolor='#7C6FA0'))
+ELEV_LAYOUT  = dict(template="forestiq", margin=dict(l=0,r=0,t=0,b=0), height=220,
+                    xaxis=dict(title="Elevation (m)"),
+                    yaxis=dict(title="Cover Type ID", dtick=1, range=[-0.5, 6.5], showline=False),
+                    legend=dict(font=dict(size=9, family='JetBrains Mono'), bgcolor='rgba(13,11,26,.8)',
+                                bordercolor=GRID, borderwidth=1, orientation='h', y=-0.3))
+CURVE_LAYOUT = dict(template="forestiq", margin=dict(l=0,r=16,t=4,b=4), height=200,
+                    yaxis=dict(title="Confidence %"))
+HEAT_LAYOUT  = dict(template="forestiq", margin=dict(l=0,r=0,t=4,b=4), height=420)
+# Heatmap cells carry only the class ID (int8); the colorbar names every ID,
+# so hover labels need no per-cell strings
+HEAT_TICKS   = [f"{i} · {COVER_NAMES[i]}" for i in range(7)]
+
+def baseline_marker(x, label=None):
+    # what fig.add_vline builds, without its per-call validation
+    out = dict(shapes=[dict(type='line', x0=x, x1=x, xref='x', y0=0, y1=1, yref='y domain',
+                            line=dict(color='#EC4899', width=1.5, dash='dot'))])
+    if label:
+        out["annotations"] = [dict(text=label, x=x, xref='x', y=1, yref='y domain', xanchor='left',
+                                   yanchor='top', showarrow=False,
+                                   font=dict(size=9, family='JetBrains Mono', color='#EC4899'))]
+    return out
+
+def compact(a, decimals=None):
+    # Plotly ships NumPy arrays as typed binary: int8 / int16 / float32 shrink the payload
+    a = np.asarray(a)
+    if a.dtype.kind in "iu":
+        m = np.abs(a).max() if a.size else 0
+        return a.astype(np.int8 if m < 2**7 else np.int16 if m < 2**15 else np.int32)
+    return (a if decimals is None else np.round(a, decimals)).astype(np.float32)
+
+def show_chart(fig):
+    # serialisation to the browser happens here
+    with timer.span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar':False})
+
+# ── METRICS ───────────────────────────────────────────────────
+def begin_fragment():
+    # a fragment-only rerun starts its own timer; a full run keeps the one
+    # that already holds get_model
+    global timer, full_run, rows_at_start
+    if not full_run:
+        timer = metrics.Timer(enabled=timer.enabled)
+    full_run = False
+    rows_at_start = rows_scored()
+
+def finish_run():
+    if not timer.enabled:
+        return
+    predictions = rows_scored() - rows_at_start
+    if metrics.ENABLED:
+        get_metrics().record(page, timer, predictions)
+    if debug:
+        rows = "".join(f"| {stage} | {s * 1e3:.2f} | {n} |\n" for stage, s, n in timer.breakdown())
+        with st.expander(f"Debug · {page} rerun {timer.elapsed() * 1e3:.1f} ms", expanded=True):
+            st.markdown(f"| stage | ms | calls |\n|---|---:|---:|\n{rows}")
+            if page in ("classify", "explore"):
+                st.caption(f"rows scored: {predictions} · prediction cache: {prediction_cache.stats()}"
+                           + (f" · fast cache: {sweep_cache.stats()}" if sweep_cache is not prediction_cache else "")
+                           + f" · sweep prefetch: {get_prefetcher().stats()}")
+
 # ── NAV ───────────────────────────────────────────────────────
 tabs = [("classify","Classify","01"), ("explore","Explore","02"),
         ("reference","Reference","03")]
@@ -438,6 +569,8 @@ st.markdown(f"""
 
 
 # ── SHARED INPUTS (inline, no sidebar) ────────────────────────
+INPUT_KEYS = ["elev", "asp", "slp", "hh", "vh", "hr", "hf", "h9", "hn", "h3", "wld"]
+
 def input_panel(prefix=""):
     st.markdown('<div class="g-label">Topographic Parameters</div>', unsafe_allow_html=True)
     t1,t2,t3,t4,t5 = st.columns(5)
@@ -462,20 +595,189 @@ def input_panel(prefix=""):
 
 def build_and_predict(elevation, aspect, slope, h_hydro, v_hydro,
                        h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness):
-    w_idx = ["Rawah","Neota","Comanche Peak","Cache la Poudre"].index(wilderness)
-    w_arr = [0,0,0,0]; w_arr[w_idx] = 1
-    s_arr = [0]*40; s_arr[int(elevation/100)%40] = 1
-    base  = [elevation,aspect,slope,h_hydro,v_hydro,h_roads,hs_9am,hs_noon,hs_3pm,h_fire]
-    full  = base + w_arr + s_arr
-    X     = np.array([full[:len(feature_names)]])
-    if X.shape[1] < len(feature_names):
-        X = np.hstack([X, np.zeros((1, len(feature_names)-X.shape[1]))])
-    Xs    = scaler.transform(X[:, :scaler.n_features_in_])
-    pred  = int(model.predict(Xs)[0])
-    try:    probs = model.predict_proba(Xs)[0]
-    except: probs = np.zeros(7); probs[pred] = 1.0
-    if len(probs) < 7: probs = np.pad(probs, (0, 7-len(probs)))
-    return pred, probs
+    # the trees' spread comes out of the same walk as the probabilities
+    preds, probs, spread = predict_spread(*scorer, feature_names,
+                                          [(elevation, aspect, slope, h_hydro, v_hydro,
+                                            h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness)],
+                                          cache=prediction_cache)
+    return int(preds[0]), probs[0], None if spread is None else tuple(a[0] for a in spread)
+
+def sweep_axis(rng):
+    return np.arange(rng[0], rng[1]+1, max(1,(rng[1]-rng[0])//50))
+
+# Explore's elevation strip, then its four sensitivity curves (sweep_defs)
+ELEV_RANGE = np.arange(1800, 3901, 30)
+SWEEP_LIST = [(0, ELEV_RANGE)] + [(pidx, sweep_axis(rng)) for pidx, rng in
+                                  [(0, (1800,3900)), (2, (0,52)), (3, (0,1400)), (5, (0,7000))]]
+
+def explore_sweeps(params_base):
+    # safe off the script thread: no Streamlit calls, and both caches are locked.
+    # Only the sweeps: the headline is scored live by build_and_predict, never read off the index
+    if surface is not None and surface.covers(params_base, SWEEP_LIST):
+        return surface.sweeps(params_base, SWEEP_LIST)
+    return predict_sweeps(*sweep_scorer, feature_names, params_base, SWEEP_LIST, cache=sweep_cache,
+                          spread=True)[1]
+
+# Explore's 2-D heatmap: any two of the numeric inputs (PARAMS order), up to 200 steps a side
+HEAT_INPUTS = ["Elevation (m)", "Aspect (°)", "Slope (°)", "H-Dist Water (m)", "V-Dist Water (m)",
+               "H-Dist Roads (m)", "H-Dist Fire (m)", "Hillshade 9am", "Hillshade Noon", "Hillshade 3pm"]
+
+def transitions_text(segments, unit):
+    # the gap between two runs is the exact interval holding the change
+    return " · ".join(f"{a[1]:,.0f}–{b[0]:,.0f}{unit} {COVER_NAMES[a[2]]} → {COVER_NAMES[b[2]]}"
+                      for a, b in zip(segments[:-1], segments[1:])) or "no class change"
+
+def heat_axis(pidx, n):
+    # whole-number steps, as the sliders use; narrow ranges get fewer than n
+    return np.unique(np.linspace(*PARAM_RANGES[pidx], n).round())
+
+def seed_inputs(prefix, params):
+    # only while the target widgets are not on the page, or Streamlit warns
+    for k, v in zip(INPUT_KEYS, params):
+        st.session_state[f"{prefix}{k}"] = v
+
+
+# ── MEMOISED VIEW PIECES ──────────────────────────────────────
+# Keyed on exactly the inputs each piece shows, so a rerun rebuilds only
+# what changed: moving Slope redraws the feature profile, but the zone
+# list, wilderness card and cover grid come back from the cache.
+ELEV_ZONES = [
+    (1800, 2200, "Low Montane"),
+    (2200, 2800, "Mid Montane"),
+    (2800, 3200, "Upper Montane"),
+    (3200, 3600, "Subalpine"),
+    (3600, 3900, "Alpine"),
+]
+W_DATA = {
+    "Rawah":            ("Large wilderness, diverse elevations", "#8B5CF6"),
+    "Neota":            ("Small, high-elevation meadows", "#60A5FA"),
+    "Comanche Peak":    ("Complex terrain, mixed forest", "#34D399"),
+    "Cache la Poudre":  ("Lower elevation, riparian areas", "#FBBF24"),
+}
+
+def elevation_zone(elevation):
+    return next((k for k, (lo, hi, _) in enumerate(ELEV_ZONES) if lo <= elevation < hi), None)
+
+@lru_cache(maxsize=None)
+def elev_zone_html(k, active):
+    lo, hi, label = ELEV_ZONES[k]
+    return f"""
+    <div class="elev-zone {"active" if active else ""}">
+      <span class="elev-name {"active" if active else ""}">{"→ " if active else ""}{label}</span>
+      <span class="elev-range {"active" if active else ""}">{lo}–{hi}m</span>
+    </div>"""
+
+@lru_cache(maxsize=None)
+def wilderness_html(wilderness):
+    wdesc, wcol = W_DATA.get(wilderness, ("Wilderness area", "#8B5CF6"))
+    return f"""
+    <div style="margin-top:8px;background:var(--violet-dim);border:1px solid var(--violet-brd);
+                border-radius:12px;padding:10px 12px;">
+      <div style="font-family:'JetBrains Mono',monospace;font-size:.55rem;color:var(--violet2);
+                  text-transform:uppercase;letter-spacing:.12em;margin-bottom:4px;">Wilderness Area</div>
+      <div style="font-size:.85rem;font-weight:600;color:var(--text);">{wilderness}</div>
+      <div style="font-size:.68rem;color:var(--text3);margin-top:3px;">{wdesc}</div>
+    </div>"""
+
+@lru_cache(maxsize=1024)
+def prob_row_html(i, on, pct):
+    return f"""
+    <div style="display:flex;align-items:center;justify-content:space-between;
+                padding:5px 8px;border-radius:8px;margin-bottom:2px;
+                background:{''+COVER_DIMS[i] if on else 'transparent'};
+                border:1px solid {''+COVER_BRDS[i] if on else 'transparent'};">
+      <span style="font-size:.73rem;color:{''+COVER_COLORS[i] if on else 'var(--text3)'};
+                   font-weight:{'600' if on else '400'};display:flex;align-items:center;gap:6px;">
+        <span style="width:7px;height:7px;border-radius:50%;background:{COVER_COLORS[i]};
+                     box-shadow:0 0 5px {COVER_COLORS[i]};display:inline-block;"></span>
+        {COVER_NAMES[i][:16]}
+      </span>
+      <span style="font-family:'JetBrains Mono',monospace;font-size:.6rem;color:var(--text3);">
+        {pct}
+      </span>
+    </div>"""
+
+@lru_cache(maxsize=1024)
+def cover_card_html(i, is_pred, pct):
+    return f"""
+    <div class="cover-g {"selected" if is_pred else ""}"
+         style="border-color:{''+COVER_BRDS[i] if is_pred else 'var(--glass-brd)'};
+                background:{''+COVER_DIMS[i] if is_pred else 'var(--glass-bg)'};">
+      <div class="cover-icon">{COVER_ICONS[i]}</div>
+      <div class="cover-name {"selected" if is_pred else ""}"
+           style="color:{''+COVER_COLORS[i] if is_pred else 'var(--text3)'};">
+        {COVER_NAMES[i]}
+      </div>
+      <div style="font-family:'JetBrains Mono',monospace;font-size:.55rem;
+                  color:{''+COVER_COLORS[i] if is_pred else 'var(--text4)'};margin-top:5px;">
+        {pct}
+      </div>
+    </div>"""
+
+# Figures are only serialised by st.plotly_chart, never mutated, so sharing them is safe
+@lru_cache(maxsize=256)
+def prob_figure(pred_class, probs, spread=None):
+    bar_c = [COVER_COLORS[i] for i in range(7)]
+    opacs = [0.9 if i == pred_class else 0.25 for i in range(7)]
+    # spread: per-class (std, lo, hi) across the trees, drawn as ±1 std whiskers
+    extra = {} if spread is None else dict(
+        error_x=dict(type='data', array=compact(spread[0], 4), color='rgba(184,174,216,.55)',
+                     thickness=1.2, width=3),
+        customdata=compact(np.column_stack(spread), 4),
+        hovertemplate=f'%{{y}}: %{{x:.1%}} ± %{{customdata[0]:.1%}}<br>trees '
+                      f'{SPREAD_QUANTILES[0]:.0%}–{SPREAD_QUANTILES[1]:.0%}: '
+                      f'%{{customdata[1]:.0%}}–%{{customdata[2]:.0%}}<extra></extra>')
+    return go.Figure(go.Bar(**dict(dict(
+        y=[COVER_NAMES[i] for i in range(7)],
+        x=compact(probs, 4),
+        orientation='h',
+        marker=dict(color=bar_c, opacity=opacs, line=dict(width=0)),
+        text=[f'{probs[i]:.1%}' for i in range(7)],
+        textposition='outside',
+        textfont=dict(size=9.5, family='JetBrains Mono', color='#7C6FA0'),
+        hovertemplate='%{y}: %{x:.1%}<extra></extra>',
+        showlegend=False, width=0.6,
+    ), **extra)), layout=PROB_LAYOUT)
+
+# Labels for inference.ATTR_INPUTS
+ATTR_LABELS = ["Elevation", "Aspect", "Slope", "H-Dist Water", "V-Dist Water", "H-Dist Roads",
+               "H-Dist Fire", "Hillshade 9am", "Hillshade Noon", "Hillshade 3pm", "Wilderness", "Soil (elev.)"]
+
+@lru_cache(maxsize=256)
+def attribution_figure(pred_class, other, diffs):
+    # diffs: per input, points it adds to pred_class over other; largest at the top
+    order = sorted(range(len(diffs)), key=lambda i: abs(diffs[i]))
+    return go.Figure(go.Bar(
+        y=[ATTR_LABELS[i] for i in order],
+        x=compact([diffs[i] for i in order], 1),
+        orientation='h',
+        marker=dict(color=[COVER_COLORS[pred_class] if diffs[i] >= 0 else COVER_COLORS[other] for i in order],
+                    opacity=0.8, line=dict(width=0)),
+        hovertemplate=f'%{{y}}: %{{x:+.1f}} pts toward {COVER_NAMES[pred_class]}<extra></extra>',
+        showlegend=False, width=0.6,
+    ), layout=ATTR_LAYOUT)
+
+@lru_cache(maxsize=256)
+def feature_figure(elevation, aspect, slope, h_hydro, v_hydro, h_roads, hs_9am, hs_noon):
+    norm = {
+        'Elevation':     (elevation-1800)/(3900-1800),
+        'Aspect':        aspect/360,
+        'Slope':         slope/52,
+        'H-Hydro':       h_hydro/1400,
+        'V-Hydro':       (v_hydro+150)/750,
+        'H-Roads':       h_roads/7000,
+        'Hillshade 9am': hs_9am/254,
+        'Hillshade Noon':hs_noon/254,
+    }
+    labs = list(norm.keys()); vals = list(norm.values())
+    bar_c2 = ['#34D399' if v>=.7 else '#FBBF24' if v>=.4 else '#F87171' for v in vals]
+    return go.Figure(go.Bar(
+        y=labs, x=compact(vals, 4), orientation='h',
+        marker=dict(color=bar_c2, opacity=0.82, line=dict(width=0)),
+        text=[f'{v:.0%}' for v in vals], textposition='outside',
+        textfont=dict(size=9.5, family='JetBrains Mono', color='#7C6FA0'),
+        hovertemplate='%{y}: %{x:.1%}<extra></extra>', showlegend=False, width=0.55,
+    ), layout=FEAT_LAYOUT)
 
 
 # ══════════════════════════════════════════════════════════════
@@ -484,190 +786,130 @@ def build_and_predict(elevation, aspect, slope, h_hydro, v_hydro,
 if page == "classify":
     st.markdown('<div class="shell">', unsafe_allow_html=True)
 
-    elevation, aspect, slope, h_hydro, v_hydro, h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness = input_panel("cl_")
-    pred_class, probs = build_and_predict(elevation, aspect, slope, h_hydro, v_hydro,
-                                           h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness)
+    @st.fragment
+    def classify_view():
+        begin_fragment()
+        elevation, aspect, slope, h_hydro, v_hydro, h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness = input_panel("cl_")
+        params = (elevation, aspect, slope, h_hydro, v_hydro, h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness)
+        # Explore opens on this baseline with its sweeps already under way, unless
+        # the user has set Explore's own inputs; those are restored instead, as
+        # Streamlit drops the state of widgets that are off the page
+        own = st.session_state.get("ex_own")
+        if own is not None:
+            seed_inputs("ex_", own)
+        else:
+            if st.session_state.get("ex_seeded") != params:
+                seed_inputs("ex_", params)
+                st.session_state.ex_seeded = params
+            get_prefetcher().submit(st.session_state, (MODEL_STAMP, params), explore_sweeps, params)
+        with timer.span("predict"):
+            pred_class, probs, spread = build_and_predict(elevation, aspect, slope, h_hydro, v_hydro,
+                                                           h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness)
+        pcts = tuple(f"{p:.1%}" for p in probs)
 
-    col, gcol, gbg, gbd = (COVER_COLORS[pred_class], COVER_COLORS[pred_class],
-                            COVER_DIMS[pred_class], COVER_BRDS[pred_class])
+        col, gcol, gbg, gbd = (COVER_COLORS[pred_class], COVER_COLORS[pred_class],
+                                COVER_DIMS[pred_class], COVER_BRDS[pred_class])
 
-    st.markdown('<div style="height:1.5rem"></div>', unsafe_allow_html=True)
-    st.markdown('<div class="g-label">Classification Result</div>', unsafe_allow_html=True)
+        st.markdown('<div style="height:1.5rem"></div>', unsafe_allow_html=True)
+        st.markdown('<div class="g-label">Classification Result</div>', unsafe_allow_html=True)
 
-    c_res, c_chart, c_context = st.columns([1, 2.2, 1.3], gap="medium")
+        c_res, c_chart, c_context = st.columns([1, 2.2, 1.3], gap="medium")
 
-    with c_res:
-        confidence = float(probs[pred_class]) * 100
-        st.markdown(f"""
-        <div class="result-g" style="border-color:{gbd};box-shadow:0 0 32px {gbg};">
-          <div class="result-icon">{COVER_ICONS[pred_class]}</div>
-          <div class="result-eyebrow">Predicted Type</div>
-          <div class="result-name" style="color:{col};">{COVER_NAMES[pred_class]}</div>
-          <div class="result-desc">{COVER_DESC[pred_class]}</div>
-          <div class="conf-block" style="background:{gbg};border:1px solid {gbd};">
-            <div class="conf-label" style="color:{col};">Confidence</div>
-            <div class="conf-val" style="color:{col};">{confidence:.1f}%</div>
-          </div>
-          <div style="margin-top:14px;">
-        """, unsafe_allow_html=True)
-        for i in range(7):
-            on = i == pred_class
+        with c_res:
+            confidence = float(probs[pred_class]) * 100
             st.markdown(f"""
-            <div style="display:flex;align-items:center;justify-content:space-between;
-                        padding:5px 8px;border-radius:8px;margin-bottom:2px;
-                        background:{''+COVER_DIMS[i] if on else 'transparent'};
-                        border:1px solid {''+COVER_BRDS[i] if on else 'transparent'};">
-              <span style="font-size:.73rem;color:{''+COVER_COLORS[i] if on else 'var(--text3)'};
-                           font-weight:{'600' if on else '400'};display:flex;align-items:center;gap:6px;">
-                <span style="width:7px;height:7px;border-radius:50%;background:{COVER_COLORS[i]};
-                             box-shadow:0 0 5px {COVER_COLORS[i]};display:inline-block;"></span>
-                {COVER_NAMES[i][:16]}
-              </span>
-              <span style="font-family:'JetBrains Mono',monospace;font-size:.6rem;color:var(--text3);">
-                {probs[i]:.1%}
-              </span>
-            </div>""", unsafe_allow_html=True)
-        st.markdown('</div></div>', unsafe_allow_html=True)
-
-    with c_chart:
-        # Probability chart
-        st.markdown('<div class="gcard"><div class="ct-eyebrow">01 — Class Probabilities</div><div class="ct-title">Prediction Confidence · All 7 Cover Types</div>', unsafe_allow_html=True)
-        bar_c = [COVER_COLORS[i] for i in range(7)]
-        opacs = [0.9 if i == pred_class else 0.25 for i in range(7)]
-        fig_prob = go.Figure(go.Bar(
-            y=[COVER_NAMES[i] for i in range(7)],
-            x=[probs[i] for i in range(7)],
-            orientation='h',
-            marker=dict(color=bar_c, opacity=opacs, line=dict(width=0)),
-            text=[f'{probs[i]:.1%}' for i in range(7)],
-            textposition='outside',
-            textfont=dict(size=9.5, family='JetBrains Mono', color='#7C6FA0'),
-            hovertemplate='%{y}: %{x:.1%}<extra></extra>',
-            showlegend=False, width=0.6,
-        ))
-        fig_prob.update_layout(
-            **CC(), margin=dict(l=0, r=52, t=4, b=4), height=260,
-            xaxis=dict(range=[0,1.3], gridcolor=GRID, zeroline=False,
-                       tickformat='.0%', tickfont=TICK, showline=True, linecolor=GRID),
-            yaxis=dict(gridcolor='rgba(0,0,0,0)',
-                       tickfont=dict(size=11, family='JetBrains Mono', color='#B8AED8')),
-        )
-        st.plotly_chart(fig_prob, use_container_width=True, config={'displayModeBar':False})
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        st.markdown('<div style="height:.6rem"></div>', unsafe_allow_html=True)
+            <div class="result-g" style="border-color:{gbd};box-shadow:0 0 32px {gbg};">
+              <div class="result-icon">{COVER_ICONS[pred_class]}</div>
+              <div class="result-eyebrow">Predicted Type</div>
+              <div class="result-name" style="color:{col};">{COVER_NAMES[pred_class]}</div>
+              <div class="result-desc">{COVER_DESC[pred_class]}</div>
+              <div class="conf-block" style="background:{gbg};border:1px solid {gbd};">
+                <div class="conf-label" style="color:{col};">Confidence</div>
+                <div class="conf-val" style="color:{col};">{confidence:.1f}%</div>
+              </div>
+              <div style="margin-top:14px;">
+            """, unsafe_allow_html=True)
+            for i in range(7):
+                st.markdown(prob_row_html(i, i == pred_class, pcts[i]), unsafe_allow_html=True)
+            st.markdown('</div></div>', unsafe_allow_html=True)
+
+        with c_chart:
+            # Probability chart
+            st.markdown('<div class="gcard"><div class="ct-eyebrow">01 — Class Probabilities</div><div class="ct-title">Prediction Confidence · All 7 Cover Types</div>', unsafe_allow_html=True)
+            with timer.span("figures"):
+                fig_prob = prob_figure(pred_class, tuple(float(p) for p in probs),
+                                       None if spread is None else tuple(tuple(map(float, a)) for a in spread))
+            show_chart(fig_prob)
+            st.markdown('</div>', unsafe_allow_html=True)
 
-        # Input feature radar
-        st.markdown('<div class="gcard"><div class="ct-eyebrow">02 — Input Feature Profile</div><div class="ct-title">Normalised Dimensions</div>', unsafe_allow_html=True)
-        norm = {
-            'Elevation':     (elevation-1800)/(3900-1800),
-            'Aspect':        aspect/360,
-            'Slope':         slope/52,
-            'H-Hydro':       h_hydro/1400,
-            'V-Hydro':       (v_hydro+150)/750,
-            'H-Roads':       h_roads/7000,
-            'Hillshade 9am': hs_9am/254,
-            'Hillshade Noon':hs_noon/254,
-        }
-        labs = list(norm.keys()); vals = list(norm.values())
-        bar_c2 = ['#34D399' if v>=.7 else '#FBBF24' if v>=.4 else '#F87171' for v in vals]
-        fig_feat = go.Figure(go.Bar(
-            y=labs, x=vals, orientation='h',
-            marker=dict(color=bar_c2, opacity=0.82, line=dict(width=0)),
-            text=[f'{v:.0%}' for v in vals], textposition='outside',
-            textfont=dict(size=9.5, family='JetBrains Mono', color='#7C6FA0'),
-            hovertemplate='%{y}: %{x:.1%}<extra></extra>', showlegend=False, width=0.55,
-        ))
-        fig_feat.update_layout(
-            **CC(), margin=dict(l=0, r=52, t=4, b=4), height=220,
-            xaxis=dict(range=[0,1.3], gridcolor=GRID, zeroline=False,
-                       tickformat='.0%', tickfont=TICK, showline=True, linecolor=GRID),
-            yaxis=dict(gridcolor='rgba(0,0,0,0)',
-                       tickfont=dict(size=11, family='JetBrains Mono', color='#B8AED8')),
-        )
-        st.plotly_chart(fig_feat, use_container_width=True, config={'displayModeBar':False})
-        st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown('<div style="height:.6rem"></div>', unsafe_allow_html=True)
 
-    with c_context:
-        st.markdown('<div class="g-label">Elevation Zone</div>', unsafe_allow_html=True)
-        elev_zones = [
-            (1800, 2200, "Low Montane"),
-            (2200, 2800, "Mid Montane"),
-            (2800, 3200, "Upper Montane"),
-            (3200, 3600, "Subalpine"),
-            (3600, 3900, "Alpine"),
-        ]
-        for lo, hi, label in elev_zones:
-            active = lo <= elevation < hi
-            st.markdown(f"""
-            <div class="elev-zone {"active" if active else ""}">
-              <span class="elev-name {"active" if active else ""}">{"→ " if active else ""}{label}</span>
-              <span class="elev-range {"active" if active else ""}">{lo}–{hi}m</span>
-            </div>""", unsafe_allow_html=True)
+            # Input feature radar
+            st.markdown('<div class="gcard"><div class="ct-eyebrow">02 — Input Feature Profile</div><div class="ct-title">Normalised Dimensions</div>', unsafe_allow_html=True)
+            with timer.span("figures"):
+                fig_feat = feature_figure(elevation, aspect, slope, h_hydro, v_hydro, h_roads, hs_9am, hs_noon)
+            show_chart(fig_feat)
+            st.markdown('</div>', unsafe_allow_html=True)
 
-        st.markdown('<div style="height:.8rem"></div>', unsafe_allow_html=True)
+            # Per-prediction attributions: why the top class beat the runner-up
+            other = int(np.argsort(probs)[-2])
+            st.markdown('<div style="height:.6rem"></div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="gcard"><div class="ct-eyebrow">03 — Why This Class</div><div class="ct-title">{COVER_NAMES[pred_class]} over {COVER_NAMES[other]} · Contribution per Input</div>', unsafe_allow_html=True)
+            if engine is not None:
+                with timer.span("attributions"):
+                    _, _, contrib = predict_contributions(engine, feature_names, [params], cache=prediction_cache)
+                    diff = (contrib[0, :, pred_class] - contrib[0, :, other]) * 100
+                with timer.span("figures"):
+                    fig_attr = attribution_figure(pred_class, other, tuple(round(float(d), 1) for d in diff))
+                show_chart(fig_attr)
+            else:
+                st.caption("Attributions need the compiled tree engine (a random forest or tree, FORESTIQ_ENGINE=compiled).")
+            st.markdown('</div>', unsafe_allow_html=True)
 
-        # Contextual insights
-        tips = []
-        if elevation > 3200:
-            tips.append(("warn","◈","High Elevation","Subalpine zone — expect Krummholz or Spruce/Fir dominance."))
-        elif elevation > 2800:
-            tips.append(("ok","✓","Upper Montane","Prime Lodgepole Pine territory."))
-        else:
-            tips.append(("ok","✓","Mid Montane","Broad species mix, Ponderosa likely."))
+        with c_context:
+            st.markdown('<div class="g-label">Elevation Zone</div>', unsafe_allow_html=True)
+            zone = elevation_zone(elevation)
+            for k in range(len(ELEV_ZONES)):
+                st.markdown(elev_zone_html(k, k == zone), unsafe_allow_html=True)
+
+            st.markdown('<div style="height:.8rem"></div>', unsafe_allow_html=True)
+
+            # Contextual insights
+            tips = []
+            if elevation > 3200:
+                tips.append(("warn","◈","High Elevation","Subalpine zone — expect Krummholz or Spruce/Fir dominance."))
+            elif elevation > 2800:
+                tips.append(("ok","✓","Upper Montane","Prime Lodgepole Pine territory."))
+            else:
+                tips.append(("ok","✓","Mid Montane","Broad species mix, Ponderosa likely."))
+
+            if slope > 30:
+                tips.append(("warn","→","Steep Slope","High erosion risk, affects soil type distribution."))
+            if h_hydro < 150:
+                tips.append(("info","◉","Near Water","Riparian influence — favors Cottonwood/Willow."))
+            if hs_9am < 100 or hs_noon < 150:
+                tips.append(("warn","→","Low Hillshade","North-facing aspect — cold shaded microclimate."))
+
+            for sev, ico, title, body in tips[:4]:
+                st.markdown(f"""
+                <div class="ins-g {sev}">
+                  <span class="ins-ico">{ico}</span>
+                  <div><div class="ins-t">{title}</div><div class="ins-b">{body}</div></div>
+                </div>""", unsafe_allow_html=True)
 
-        if slope > 30:
-            tips.append(("warn","→","Steep Slope","High erosion risk, affects soil type distribution."))
-        if h_hydro < 150:
-            tips.append(("info","◉","Near Water","Riparian influence — favors Cottonwood/Willow."))
-        if hs_9am < 100 or hs_noon < 150:
-            tips.append(("warn","→","Low Hillshade","North-facing aspect — cold shaded microclimate."))
+            # Wilderness info
+            st.markdown(wilderness_html(wilderness), unsafe_allow_html=True)
 
-        for sev, ico, title, body in tips[:4]:
-            st.markdown(f"""
-            <div class="ins-g {sev}">
-              <span class="ins-ico">{ico}</span>
-              <div><div class="ins-t">{title}</div><div class="ins-b">{body}</div></div>
-            </div>""", unsafe_allow_html=True)
+        # Cover type grid
+        st.markdown('<div class="rule"></div>', unsafe_allow_html=True)
+        st.markdown('<div class="g-label">All 7 Cover Types</div>', unsafe_allow_html=True)
+        g7 = st.columns(7, gap="small")
+        for i, col_w in enumerate(g7):
+            with col_w:
+                st.markdown(cover_card_html(i, i == pred_class, pcts[i]), unsafe_allow_html=True)
+        finish_run()
 
-        # Wilderness info
-        w_data = {
-            "Rawah":            ("Large wilderness, diverse elevations", "#8B5CF6"),
-            "Neota":            ("Small, high-elevation meadows", "#60A5FA"),
-            "Comanche Peak":    ("Complex terrain, mixed forest", "#34D399"),
-            "Cache la Poudre":  ("Lower elevation, riparian areas", "#FBBF24"),
-        }
-        wdesc, wcol = w_data.get(wilderness, ("Wilderness area", "#8B5CF6"))
-        st.markdown(f"""
-        <div style="margin-top:8px;background:var(--violet-dim);border:1px solid var(--violet-brd);
-                    border-radius:12px;padding:10px 12px;">
-          <div style="font-family:'JetBrains Mono',monospace;font-size:.55rem;color:var(--violet2);
-                      text-transform:uppercase;letter-spacing:.12em;margin-bottom:4px;">Wilderness Area</div>
-          <div style="font-size:.85rem;font-weight:600;color:var(--text);">{wilderness}</div>
-          <div style="font-size:.68rem;color:var(--text3);margin-top:3px;">{wdesc}</div>
-        </div>""", unsafe_allow_html=True)
-
-    # Cover type grid
-    st.markdown('<div class="rule"></div>', unsafe_allow_html=True)
-    st.markdown('<div class="g-label">All 7 Cover Types</div>', unsafe_allow_html=True)
-    g7 = st.columns(7, gap="small")
-    for i, col_w in enumerate(g7):
-        is_pred = (i == pred_class)
-        with col_w:
-            st.markdown(f"""
-            <div class="cover-g {"selected" if is_pred else ""}"
-                 style="border-color:{''+COVER_BRDS[i] if is_pred else 'var(--glass-brd)'};
-                        background:{''+COVER_DIMS[i] if is_pred else 'var(--glass-bg)'};">
-              <div class="cover-icon">{COVER_ICONS[i]}</div>
-              <div class="cover-name {"selected" if is_pred else ""}"
-                   style="color:{''+COVER_COLORS[i] if is_pred else 'var(--text3)'};">
-                {COVER_NAMES[i]}
-              </div>
-              <div style="font-family:'JetBrains Mono',monospace;font-size:.55rem;
-                          color:{''+COVER_COLORS[i] if is_pred else 'var(--text4)'};margin-top:5px;">
-                {probs[i]:.1%}
-              </div>
-            </div>""", unsafe_allow_html=True)
+    classify_view()
 
     st.markdown("""
     <div class="g-footer">
@@ -689,99 +931,164 @@ if page == "classify":
 elif page == "explore":
     st.markdown('<div class="shell">', unsafe_allow_html=True)
 
-    elevation, aspect, slope, h_hydro, v_hydro, h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness = input_panel("ex_")
-    pred_class, probs = build_and_predict(elevation, aspect, slope, h_hydro, v_hydro,
-                                           h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness)
+    def follow_classify(params_base):
+        st.session_state.pop("ex_own", None)
+        st.session_state.ex_seeded = params_base
+
+    @st.fragment
+    def explore_view():
+        begin_fragment()
+        elevation, aspect, slope, h_hydro, v_hydro, h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness = input_panel("ex_")
+        params_base = (elevation, aspect, slope, h_hydro, v_hydro, h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness)
+        # moving a slider here detaches Explore from Classify's inputs until asked to follow again
+        if params_base != st.session_state.setdefault("ex_seeded", params_base):
+            st.session_state.ex_own = params_base
+        if st.session_state.get("ex_own") is not None:
+            n1, n2 = st.columns([4, 1])
+            with n1: st.caption("Explore keeps the inputs set here; changes on Classify no longer move them.")
+            with n2:
+                st.button("Follow Classify", key="ex_follow", on_click=follow_classify, args=(params_base,))
+
+        # One inference for the baseline, the elevation strip and all four curves
+        sweep_defs = [
+            (0, (1800,3900), elevation, "Elevation Sweep",   "Elevation (m)", "#8B5CF6"),
+            (2, (0,52),      slope,     "Slope Sweep",        "Slope (°)",     "#60A5FA"),
+            (3, (0,1400),    h_hydro,   "H-Hydro Sweep",      "Distance (m)",  "#FBBF24"),
+            (5, (0,7000),    h_roads,   "H-Roads Sweep",      "Distance (m)",  "#EC4899"),
+        ]
+        elev_range = ELEV_RANGE
+        # the headline comes from the accurate model, as on Classify; the fast one only draws the sweeps
+        with timer.span("predict"):
+            pred_class, probs, _ = build_and_predict(*params_base)
+        with timer.span("sweeps"):
+            # usually already computed in the background from Classify
+            result = get_prefetcher().result(st.session_state, (MODEL_STAMP, params_base))
+            sweeps = result if result is not None else explore_sweeps(params_base)
+        elev_preds = sweeps[0][0]
+        # bisection to 1 unit along every sweep_defs axis, instead of reading transitions off the fixed steps
+        adaptive = st.toggle("Adaptive class boundaries", key="ex_adapt")
+        if adaptive:
+            with timer.span("boundaries"):
+                bounds, bound_rows, bound_rounds = find_boundaries(
+                    *sweep_scorer, feature_names, params_base,
+                    tuple((pidx, *rng) for pidx, rng, *_ in sweep_defs), cache=sweep_cache)
+
+        # Metrics strip
+        st.markdown(f"""
+        <div class="g-strip" style="margin-top:1rem;">
+          <div class="g-strip-item"><div class="gsi-v">{COVER_ICONS[pred_class]} {COVER_NAMES[pred_class]}</div><div class="gsi-l">Predicted Type</div></div>
+          <div class="g-strip-item"><div class="gsi-v" style="color:{COVER_COLORS[pred_class]};">{probs[pred_class]:.0%}</div><div class="gsi-l">Confidence</div></div>
+          <div class="g-strip-item"><div class="gsi-v">{elevation}m</div><div class="gsi-l">Elevation</div></div>
+          <div class="g-strip-item"><div class="gsi-v">{slope}°</div><div class="gsi-l">Slope</div></div>
+        </div>
+        """, unsafe_allow_html=True)
 
-    # Metrics strip
-    st.markdown(f"""
-    <div class="g-strip" style="margin-top:1rem;">
-      <div class="g-strip-item"><div class="gsi-v">{COVER_ICONS[pred_class]} {COVER_NAMES[pred_class]}</div><div class="gsi-l">Predicted Type</div></div>
-      <div class="g-strip-item"><div class="gsi-v" style="color:{COVER_COLORS[pred_class]};">{probs[pred_class]:.0%}</div><div class="gsi-l">Confidence</div></div>
-      <div class="g-strip-item"><div class="gsi-v">{elevation}m</div><div class="gsi-l">Elevation</div></div>
-      <div class="g-strip-item"><div class="gsi-v">{slope}°</div><div class="gsi-l">Slope</div></div>
-    </div>
-    """, unsafe_allow_html=True)
+        st.markdown('<div style="height:1rem"></div>', unsafe_allow_html=True)
+        st.markdown('<div class="g-label">Elevation Sensitivity</div>', unsafe_allow_html=True)
+
+        st.markdown('<div class="gcard"><div class="ct-eyebrow">Cover Type vs Elevation</div><div class="ct-title">Predicted Class as Elevation Varies · All Other Inputs Fixed</div>', unsafe_allow_html=True)
+        with timer.span("figures"):
+            elev_preds = np.asarray(elev_preds)
+            if adaptive:
+                # one bar per run of a class, drawn from run start to run end
+                fig_elev = go.Figure([go.Scatter(
+                    x=[x for a, b, _ in runs for x in (a, b, None)], y=[i, i, None] * len(runs),
+                    mode='lines', line=dict(color=COVER_COLORS[i], width=12),
+                    name=COVER_NAMES[i],
+                    hovertemplate=f'{COVER_NAMES[i]}<br>%{{x}}m<extra></extra>'
+                ) for i, runs in ((i, [r for r in bounds[0] if r[2] == i]) for i in range(7)) if runs],
+                    layout=dict(ELEV_LAYOUT, **baseline_marker(elevation, "  baseline")))
+            else:
+                fig_elev = go.Figure([go.Scatter(
+                    x=compact(elev_range[mask]), y=compact(np.full(mask.sum(), i)),
+                    mode='markers',
+                    marker=dict(color=COVER_COLORS[i], size=10, opacity=0.85, symbol='square',
+                                line=dict(color='rgba(0,0,0,.4)', width=1)),
+                    name=COVER_NAMES[i],
+                    hovertemplate=f'{COVER_NAMES[i]}<br>%{{x}}m<extra></extra>'
+                ) for i, mask in ((i, elev_preds == i) for i in range(7)) if mask.any()],
+                    layout=dict(ELEV_LAYOUT, **baseline_marker(elevation, "  baseline")))
+        show_chart(fig_elev)
+        if adaptive:
+            st.caption(f"{transitions_text(bounds[0], ' m')} · {bound_rows} rows in {bound_rounds} "
+                       f"batched rounds for all {len(sweep_defs)} axes, vs "
+                       f"{sum(hi - lo + 1 for _, (lo, hi), *_ in sweep_defs):,} at a 1-unit step")
+        st.markdown('</div>', unsafe_allow_html=True)
 
-    st.markdown('<div style="height:1rem"></div>', unsafe_allow_html=True)
-    st.markdown('<div class="g-label">Elevation Sensitivity</div>', unsafe_allow_html=True)
-
-    st.markdown('<div class="gcard"><div class="ct-eyebrow">Cover Type vs Elevation</div><div class="ct-title">Predicted Class as Elevation Varies · All Other Inputs Fixed</div>', unsafe_allow_html=True)
-    elev_range = np.arange(1800, 3901, 30)
-    elev_preds = []
-    for e in elev_range:
-        p, _ = build_and_predict(int(e), aspect, slope, h_hydro, v_hydro,
-                                  h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness)
-        elev_preds.append(p)
-
-    fig_elev = go.Figure()
-    for i in range(7):
-        mask = np.array(elev_preds) == i
-        if mask.any():
-            fig_elev.add_trace(go.Scatter(
-                x=elev_range[mask], y=np.ones(mask.sum())*i,
-                mode='markers',
-                marker=dict(color=COVER_COLORS[i], size=10, opacity=0.85, symbol='square',
-                            line=dict(color='rgba(0,0,0,.4)', width=1)),
-                name=COVER_NAMES[i],
-                hovertemplate=f'{COVER_NAMES[i]}<br>%{{x}}m<extra></extra>'
-            ))
-    fig_elev.add_vline(x=elevation, line=dict(color='#EC4899', width=1.5, dash='dot'),
-        annotation_text="  baseline", annotation_font=dict(size=9, family='JetBrains Mono', color='#EC4899'))
-    fig_elev.update_layout(
-        **CC(), margin=dict(l=0,r=0,t=0,b=0), height=220,
-        xaxis=dict(title="Elevation (m)", gridcolor=GRID, zeroline=False, tickfont=TICK,
-                   title_font=AX, showline=True, linecolor=GRID),
-        yaxis=dict(title="Cover Type ID", gridcolor=GRID, zeroline=False, dtick=1, tickfont=TICK,
-                   title_font=AX, range=[-0.5, 6.5]),
-        legend=dict(font=dict(size=9, family='JetBrains Mono'), bgcolor='rgba(13,11,26,.8)',
-                    bordercolor=GRID, borderwidth=1, orientation='h', y=-0.3)
-    )
-    st.plotly_chart(fig_elev, use_container_width=True, config={'displayModeBar':False})
-    st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown('<div style="height:.8rem"></div>', unsafe_allow_html=True)
+        st.markdown('<div class="g-label">Input Feature Sensitivity Curves</div>', unsafe_allow_html=True)
+
+        r1 = st.columns(2, gap="medium")
+        r2 = st.columns(2, gap="medium")
+
+        def sweep_curve(xs, sweep_probs, cur_val, x_label, color, spread=None):
+            ys = sweep_probs[:, pred_class] * 100
+            with timer.span("figures"):
+                r = int(color[1:3],16); g2 = int(color[3:5],16); b = int(color[5:7],16)
+                band = []
+                if spread is not None:
+                    # ±1 std of the trees' votes around the forest's mean
+                    sd = spread[0][:, pred_class] * 100
+                    band = [go.Scatter(x=compact(xs), y=compact(np.minimum(ys + sd, 100), 1), mode='lines',
+                                       line=dict(width=0, shape='spline'), hoverinfo='skip', showlegend=False),
+                            go.Scatter(x=compact(xs), y=compact(np.maximum(ys - sd, 0), 1), mode='lines',
+                                       line=dict(width=0, shape='spline'), fill='tonexty',
+                                       fillcolor=f'rgba({r},{g2},{b},0.18)', hoverinfo='skip', showlegend=False)]
+                fig = go.Figure(band + [go.Scatter(
+                    x=compact(xs), y=compact(ys, 1), mode='lines',
+                    line=dict(color=color, width=2.5, shape='spline'),
+                    fill='tozeroy' if spread is None else None, fillcolor=f'rgba({r},{g2},{b},0.08)',
+                    hovertemplate=f'{x_label}: %{{x}} → %{{y:.1f}}%<extra></extra>', showlegend=False
+                )], layout=dict(CURVE_LAYOUT, xaxis=dict(title=x_label), **baseline_marker(cur_val)))
+            return fig
+
+        for k, (col_w, (pidx, rng, cur, lbl, xl, col_c), (_, sw_probs, sw_spread)) in enumerate(zip([r1[0],r1[1],r2[0],r2[1]], sweep_defs, sweeps[1:])):
+            with col_w:
+                st.markdown(f'<div class="gcard"><div class="ct-eyebrow">Sensitivity</div><div class="ct-title">{lbl}</div>', unsafe_allow_html=True)
+                show_chart(sweep_curve(sweep_axis(rng), sw_probs, cur, xl, col_c, sw_spread))
+                if adaptive and k:  # the elevation strip above already lists axis 0
+                    st.caption(transitions_text(bounds[k], " m" if xl.endswith("(m)") else "°"))
+                st.markdown('</div>', unsafe_allow_html=True)
 
-    st.markdown('<div style="height:.8rem"></div>', unsafe_allow_html=True)
-    st.markdown('<div class="g-label">Input Feature Sensitivity Curves</div>', unsafe_allow_html=True)
-
-    r1 = st.columns(2, gap="medium")
-    r2 = st.columns(2, gap="medium")
-
-    def sweep_curve(param_idx, rng, cur_val, label, x_label, color):
-        xs = np.arange(rng[0], rng[1]+1, max(1,(rng[1]-rng[0])//50))
-        params_base = [elevation, aspect, slope, h_hydro, v_hydro, h_roads, h_fire, hs_9am, hs_noon, hs_3pm, wilderness]
-        ys = []
-        for v in xs:
-            p_args = list(params_base); p_args[param_idx] = int(v)
-            c, pr = build_and_predict(*p_args)
-            ys.append(pr[pred_class] * 100)
-        r = int(color[1:3],16); g2 = int(color[3:5],16); b = int(color[5:7],16)
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=xs, y=ys, mode='lines',
-            line=dict(color=color, width=2.5, shape='spline'),
-            fill='tozeroy', fillcolor=f'rgba({r},{g2},{b},0.08)',
-            hovertemplate=f'{x_label}: %{{x}} → %{{y:.1f}}%<extra></extra>', showlegend=False
-        ))
-        fig.add_vline(x=cur_val, line=dict(color='#EC4899', width=1.5, dash='dot'))
-        fig.update_layout(
-            **CC(), margin=dict(l=0,r=16,t=4,b=4), height=200,
-            xaxis=dict(title=x_label, gridcolor=GRID, zeroline=False, tickfont=TICK, title_font=AX, showline=True, linecolor=GRID),
-            yaxis=dict(title="Confidence %", gridcolor=GRID, zeroline=False, tickfont=TICK, title_font=AX, showline=True, linecolor=GRID),
-        )
-        return fig
-
-    sweep_defs = [
-        (0, (1800,3900), elevation, "Elevation Sweep",   "Elevation (m)", "#8B5CF6"),
-        (2, (0,52),      slope,     "Slope Sweep",        "Slope (°)",     "#60A5FA"),
-        (3, (0,1400),    h_hydro,   "H-Hydro Sweep",      "Distance (m)",  "#FBBF24"),
-        (5, (0,7000),    h_roads,   "H-Roads Sweep",      "Distance (m)",  "#EC4899"),
-    ]
-    for col_w, (pidx, rng, cur, lbl, xl, col_c) in zip([r1[0],r1[1],r2[0],r2[1]], sweep_defs):
-        with col_w:
-            st.markdown(f'<div class="gcard"><div class="ct-eyebrow">Sensitivity</div><div class="ct-title">{lbl}</div>', unsafe_allow_html=True)
-            st.plotly_chart(sweep_curve(pidx, rng, cur, lbl, xl, col_c),
-                            use_container_width=True, config={'displayModeBar':False})
-            st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown('<div style="height:.8rem"></div>', unsafe_allow_html=True)
+        st.markdown('<div class="g-label">Interaction Heatmap</div>', unsafe_allow_html=True)
+        h1, h2, h3 = st.columns([2, 2, 1])
+        with h1: ix = st.selectbox("X axis", range(10), 0, format_func=HEAT_INPUTS.__getitem__, key="ex_hx")
+        with h2: iy = st.selectbox("Y axis", range(10), 3, format_func=HEAT_INPUTS.__getitem__, key="ex_hy")
+        with h3: n  = st.selectbox("Resolution", [50, 100, 200], 1, key="ex_hres")
+        if ix == iy:
+            iy = (ix + 1) % 10
+        xs, ys = heat_axis(ix, n), heat_axis(iy, n)
+        st.markdown(f'<div class="gcard"><div class="ct-eyebrow">Predicted Class over Two Inputs</div><div class="ct-title">{HEAT_INPUTS[iy]} vs {HEAT_INPUTS[ix]} · All Other Inputs Fixed</div>', unsafe_allow_html=True)
+        heat_slot, heat_note = st.empty(), st.empty()
+        scale = [c for i, col in enumerate(COVER_COLORS) for c in ([i / 7, col], [(i + 1) / 7, col])]
+        # coarse lattice first, then only the blocks around class boundaries
+        rounds = 0
+        for rows, cols, grid_probs, exact in predict_grid(*sweep_scorer, feature_names, params_base,
+                                                          (ix, xs), (iy, ys), cache=grid_cache):
+            rounds += 1
+            cls = grid_probs[np.ix_(rows, cols)].argmax(axis=-1)
+            with timer.span("figures"):
+                fig = go.Figure([go.Heatmap(
+                    x=compact(xs[cols]), y=compact(ys[rows]), z=compact(cls),
+                    colorscale=scale, zmin=-0.5, zmax=6.5,
+                    colorbar=dict(tickvals=list(range(7)), ticktext=HEAT_TICKS,
+                                  tickfont=TICK, thickness=10, outlinewidth=0),
+                    hovertemplate=f'{HEAT_INPUTS[ix]}: %{{x}}<br>{HEAT_INPUTS[iy]}: %{{y}}<br>Cover Type ID %{{z}}<extra></extra>'
+                ), go.Scatter(
+                    x=[params_base[ix]], y=[params_base[iy]], mode='markers', showlegend=False,
+                    marker=dict(color='#EC4899', size=11, symbol='x', line=dict(color='#fff', width=1)),
+                    hovertemplate='baseline<extra></extra>'
+                )], layout=dict(HEAT_LAYOUT, xaxis=dict(title=HEAT_INPUTS[ix]), yaxis=dict(title=HEAT_INPUTS[iy])))
+            with heat_slot:
+                show_chart(fig)
+        n_scored = int(exact.sum()) if rounds > 1 else 0
+        heat_note.caption(f"scored {n_scored:,} of {exact.size:,} cells ({n_scored / exact.size:.0%}) "
+                          f"in {rounds} batched rounds" if rounds > 1 else f"{exact.size:,} cells · cached")
+        st.markdown('</div>', unsafe_allow_html=True)
+        finish_run()
+
+    explore_view()
 
     st.markdown("""
     <div class="g-footer">
@@ -900,3 +1207,4 @@ elif page == "reference":
     </div>
     """, unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
+    finish_run()
@@ -0,0 +1,191 @@
+import json, os, shutil
+
+import numpy as np
+
+# ── ARTIFACTS ──────────────────────────────────────────────────
+# Written by the training notebook; the app falls back to a small
+# synthetic forest when they are absent.
+MODEL_PATH    = 'forest_model.pkl'
+SCALER_PATH   = 'forest_scaler.pkl'
+FEATURES_PATH = 'forest_features.json'
+MMAP_PATH     = 'forest_model_mmap'
+# Compressed model for Explore sweeps, written by compress.py
+FAST_PATH     = 'forest_model_fast'
+
+# Raw node arrays of a CompiledForest, one .npy each, next to manifest.json
+MMAP_ARRAYS   = ('feature', 'threshold', 'children', 'value', 'roots', 'is_leaf')
+
+# Synthetic fallback: trained once, then reused from the cache by every process.
+# Bump FALLBACK_VERSION whenever train_fallback() changes.
+CACHE_DIR        = os.environ.get('FORESTIQ_CACHE', '.forestiq_cache')
+FALLBACK_VERSION = 1
+
+FALLBACK_FEATURES = (['Elevation','Aspect','Slope','H_Dist_Hydro','V_Dist_Hydro',
+                      'H_Dist_Roads','Hillshade_9am','Hillshade_Noon','Hillshade_3pm','H_Dist_Fire']
+                     + [f'Wilderness_{i}' for i in range(4)] + [f'Soil_{i}' for i in range(40)])
+
+
+def model_stamp(model_path=MODEL_PATH, mmap_path=MMAP_PATH):
+    for p in (os.path.join(mmap_path, 'manifest.json'), model_path):
+        if os.path.exists(p):
+            return os.path.getmtime(p)
+    return None
+
+
+def load_artifacts(model_path=MODEL_PATH, scaler_path=SCALER_PATH, features_path=FEATURES_PATH,
+                   mmap_path=MMAP_PATH):
+    """Return ``(model, scaler, feature_names)`` from disk or the synthetic fallback.
+
+    A memory-mapped export wins over the pickle; its scaler is already folded
+    into the thresholds, so it comes back as ``scaler=None``.
+    """
+    if os.path.exists(os.path.join(mmap_path, 'manifest.json')):
+        return load_mmap(mmap_path)
+    if os.path.exists(model_path):
+        return load_pickle(model_path, scaler_path, features_path)
+    return fallback_artifacts()
+
+
+def load_pickle(model_path=MODEL_PATH, scaler_path=SCALER_PATH, features_path=FEATURES_PATH):
+    """The pickled model with its scaler and feature names.
+
+    ``scaler_path=None`` declares a model that takes raw columns. Models on
+    the compact layout (histogram boosting) are never scaled either. Any
+    other model without its scaler file is an error rather than silently
+    scoring unscaled rows.
+    """
+    import joblib
+    from inference import N_COMPACT
+    with open(features_path) as f:
+        features = json.load(f)
+    if scaler_path is not None and os.path.exists(scaler_path):
+        scaler = joblib.load(scaler_path)
+    elif scaler_path is None or len(features) == N_COMPACT:
+        scaler = None
+    else:
+        raise FileNotFoundError(f'scaler {scaler_path} not found; a model on {len(features)} '
+                                f'one-hot features is trained on scaled rows')
+    return joblib.load(model_path), scaler, features
+
+
+def save_pickle(model, scaler, features, model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+                features_path=FEATURES_PATH, mmap_path=MMAP_PATH):
+    """Write the pickle artifacts; ``scaler=None`` removes any stale scaler file.
+
+    An older memory-mapped export would shadow the new pickle in
+    ``load_artifacts``, so its manifest is removed as well.
+    """
+    import joblib
+    for stale in ([scaler_path] if scaler is None else []) + [os.path.join(mmap_path, 'manifest.json')]:
+        if os.path.exists(stale):
+            os.remove(stale)
+    joblib.dump(model, model_path)
+    if scaler is not None:
+        joblib.dump(scaler, scaler_path)
+    with open(features_path, 'w') as f:
+        json.dump(list(features), f)
+
+
+def load_estimator(model_path=MODEL_PATH, scaler_path=SCALER_PATH, features_path=FEATURES_PATH):
+    """The sklearn estimator itself: the pickle, or a freshly trained fallback."""
+    if os.path.exists(model_path):
+        return load_pickle(model_path, scaler_path, features_path)
+    return train_fallback()
+
+
+# ── MEMORY-MAPPED FORMAT ───────────────────────────────────────
+def export_mmap(model, scaler, features, out=MMAP_PATH, **extra):
+    """Write a fitted (or already compiled) forest as raw NumPy arrays plus a manifest.
+
+    Every process that loads the directory with ``mmap_mode`` shares the same
+    page-cache copy of the trees, and loading skips unpickling entirely. The
+    export is written next to ``out`` and swapped in whole, so files that
+    running processes have mapped are never truncated.
+    """
+    from forest_engine import CompiledForest
+    engine = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model, scaler)
+    tmp = f'{out}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name in MMAP_ARRAYS:
+        np.save(os.path.join(tmp, f'{name}.npy'), np.ascontiguousarray(getattr(engine, name)))
+    manifest = dict(format='forestiq-mmap', version=1, model=type(model).__name__,
+                    features=list(features), classes=engine.classes_.tolist(),
+                    n_features_in=engine.n_features_in_, max_depth=engine.max_depth,
+                    n_trees=engine.n_trees, n_nodes=len(engine.feature),
+                    scaler_folded=scaler is not None, **extra)
+    # manifest last: its presence marks a complete export
+    with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    replace_dir(tmp, out)
+    return manifest
+
+
+def replace_dir(tmp, out):
+    """Swap a finished directory in for ``out``.
+
+    The old files are unlinked, never rewritten, so a process that still
+    has them memory-mapped keeps reading the old arrays.
+    """
+    shutil.rmtree(out, ignore_errors=True)
+    os.replace(tmp, out)
+
+
+def load_mmap(path=MMAP_PATH, mmap_mode='r'):
+    from forest_engine import CompiledForest
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+              for name in MMAP_ARRAYS}
+    model  = CompiledForest(classes=manifest['classes'], n_features_in=manifest['n_features_in'],
+                            max_depth=manifest['max_depth'], **arrays)
+    return model, None, manifest['features']
+
+
+def load_fast(stamp=None, path=FAST_PATH):
+    """The compressed Explore model; ``None`` if absent or built from another model."""
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get('source_stamp') != stamp:
+        return None
+    return load_mmap(path)
+
+
+def fallback_artifacts(cache_dir=None):
+    """Synthetic model, built once and persisted as a versioned mmap artifact.
+
+    Later processes (and replicas sharing the cache directory) load it
+    instead of retraining. If the cache is not writable the freshly trained
+    model is returned as-is.
+    """
+    path = os.path.join(cache_dir or CACHE_DIR, f'fallback-v{FALLBACK_VERSION}')
+    if os.path.exists(os.path.join(path, 'manifest.json')):
+        return load_mmap(path)
+    model, scaler, features = train_fallback()
+    tmp = f'{path}.tmp-{os.getpid()}'
+    try:
+        export_mmap(model, scaler, features, tmp)
+        os.replace(tmp, path)
+    except OSError:
+        # read-only cache, or another process published first
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(path, 'manifest.json')):
+            return model, scaler, features
+    return load_mmap(path)
+
+
+def train_fallback():
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    np.random.seed(42); n = 5000; n_feats = 54
+    X    = np.random.randn(n, n_feats)
+    X[:,0] = X[:,0] * 500 + 2500
+    y    = ((X[:,0] - 1800) / 500).astype(int).clip(0, 6)
+    sc   = StandardScaler(); Xs = sc.fit_transform(X)
+    mdl  = RandomForestClassifier(n_estimators=50, random_state=42)
+    mdl.fit(Xs, y)
+    return mdl, sc, list(FALLBACK_FEATURES)
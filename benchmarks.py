@@ -0,0 +1,402 @@
+"""Performance checks for the ForestIQ inference path.
+
+    python benchmarks.py engine      # compiled forest parity + latency
+    python benchmarks.py artifacts   # pickle vs memory-mapped load time and RSS
+    python benchmarks.py startup     # import and model-load cost of a cold replica
+    python benchmarks.py suite --save               # record bench_baseline.json
+    python benchmarks.py suite --check --threshold 0.25
+    python benchmarks.py charts     # Plotly JSON payload per page, raw and gzipped
+    python benchmarks.py anytime [--data covtype.data.gz]   # early-stopped forest vs full predict_proba
+"""
+import argparse, json, os, subprocess, sys, tempfile, time
+
+import numpy as np
+
+from artifacts import MMAP_PATH, MODEL_PATH, export_mmap, load_artifacts, load_estimator
+from forest_engine import CompiledForest
+from inference import PARAM_RANGES, encode_rows, predict_anytime, predict_batch, predict_sweeps
+
+
+def random_rows(n, seed=0):
+    """Parameter rows drawn uniformly from the input_panel slider ranges."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.integers(lo, hi + 1, n) for lo, hi in PARAM_RANGES]).astype(float)
+
+
+def timeit(fn, repeat=20):
+    """Median wall time of ``fn()`` in milliseconds."""
+    fn()
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter(); fn(); times.append(time.perf_counter() - t)
+    return float(np.median(times)) * 1e3
+
+
+def samples(fn, repeat=20):
+    """``repeat`` wall times of ``fn()`` in milliseconds, after one warm-up call."""
+    fn()
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter(); fn(); times.append(time.perf_counter() - t)
+    return np.array(times) * 1e3
+
+
+def floor_and_noise(times):
+    """``(min, noise)`` of a metric's samples; noise is how far the upper quartile sits above the min.
+
+    The minimum is the run least disturbed by the rest of the machine, so it
+    moves far less between runs than the median does.
+    """
+    lo = float(np.min(times))
+    return lo, float(np.percentile(times, 75) / lo - 1)
+
+
+# ── ENGINE ─────────────────────────────────────────────────────
+def bench_engine(args):
+    model, scaler, features = load_estimator()
+    engine = CompiledForest.from_sklearn(model, scaler)
+    X = encode_rows(random_rows(args.parity_rows, seed=1), len(features))
+
+    _, ref = predict_batch(model, scaler, features, X)
+    _, got = predict_batch(engine, None, features, X)
+    diff  = float(np.abs(ref - got).max())
+    agree = float((ref.argmax(1) == got.argmax(1)).mean())
+    print(f"parity   rows={len(X)}  max|Δp|={diff:.2e}  argmax agreement={agree:.4%}")
+
+    print(f"{'batch':>7} {'sklearn ms':>11} {'compiled ms':>12} {'speedup':>8}")
+    for n in args.sizes:
+        Xn = X[:n] if n <= len(X) else encode_rows(random_rows(n, seed=2), len(features))
+        t_sk = timeit(lambda: predict_batch(model, scaler, features, Xn), args.repeat)
+        t_cf = timeit(lambda: predict_batch(engine, None, features, Xn), args.repeat)
+        print(f"{n:>7} {t_sk:>11.2f} {t_cf:>12.2f} {t_sk / t_cf:>7.1f}x")
+    return 0 if diff <= args.tol and agree >= 0.999 else 1
+
+
+# ── ARTIFACTS ──────────────────────────────────────────────────
+def _rss_kb():
+    """(anonymous, file-backed) resident set of this process in kB; Linux only."""
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            k, _, v = line.partition(":")
+            fields[k] = v.split()[0] if v.split() else "0"
+    return int(fields.get("RssAnon", 0)), int(fields.get("RssFile", 0))
+
+
+def probe_load(args):
+    """Runs in a fresh interpreter: load one artifact format, score, print JSON."""
+    import joblib
+    X = encode_rows(random_rows(256), args.n_features)
+    anon0, file0 = _rss_kb()
+    t = time.perf_counter()
+    if args.fmt == "pickle":
+        model, scaler = joblib.load(args.model), joblib.load(args.scaler)
+    else:
+        from artifacts import load_mmap
+        model, scaler, _ = load_mmap(args.path)
+    t_load = time.perf_counter() - t
+    predict_batch(model, scaler, list(range(args.n_features)), X)
+    anon1, file1 = _rss_kb()
+    print(json.dumps(dict(load_ms=t_load * 1e3, anon_mb=(anon1 - anon0) / 1024,
+                          file_mb=(file1 - file0) / 1024)))
+    return 0
+
+
+def bench_artifacts(args):
+    import joblib
+    model, scaler, features = load_estimator()
+    with tempfile.TemporaryDirectory() as tmp:
+        mp, sp, mm = (os.path.join(tmp, p) for p in ("model.pkl", "scaler.pkl", "mmap"))
+        joblib.dump(model, mp); joblib.dump(scaler, sp); export_mmap(model, scaler, features, mm)
+        size = lambda p: sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(p) for f in fs) \
+            if os.path.isdir(p) else os.path.getsize(p)
+        print(f"{'format':>7} {'size MB':>8} {'load ms':>8} {'private MB':>11} {'shared MB':>10}")
+        for fmt, disk in (("pickle", size(mp) + size(sp)), ("mmap", size(mm))):
+            runs = [json.loads(subprocess.check_output(
+                        [sys.executable, __file__, "probe", fmt, "--path", mm, "--model", mp,
+                         "--scaler", sp, "--n-features", str(len(features))]))
+                    for _ in range(args.repeat)]
+            med = {k: float(np.median([r[k] for r in runs])) for k in runs[0]}
+            print(f"{fmt:>7} {disk / 2**20:>8.1f} {med['load_ms']:>8.1f} "
+                  f"{med['anon_mb']:>11.1f} {med['file_mb']:>10.1f}")
+    print("private = anonymous RSS each process pays; shared = file-backed pages "
+          "served once from the page cache")
+    return 0
+
+
+# ── STARTUP ────────────────────────────────────────────────────
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# module -> which part of the app still imports it after lazy loading
+STARTUP_MODULES = [
+    ("numpy",                "every page"),
+    ("streamlit",            "every page"),
+    ("plotly.graph_objects", "Classify / Explore"),
+    ("joblib",               "pickle artifacts only"),
+    ("sklearn.ensemble",     "unpickling / fallback training only"),
+]
+
+
+def _fresh_ms(stmt, setup="pass"):
+    code = f"import time\n{setup}\nt = time.perf_counter()\n{stmt}\nprint(time.perf_counter() - t)"
+    return float(subprocess.check_output([sys.executable, "-c", code], cwd=HERE)) * 1e3
+
+
+def bench_startup(args):
+    print(f"{'import':<22} {'ms':>8}  needed by")
+    for mod, used in STARTUP_MODULES:
+        ms = np.median([_fresh_ms(f"import {mod}") for _ in range(args.repeat)])
+        print(f"{mod:<22} {ms:>8.1f}  {used}")
+
+    print(f"\n{'model load':<22} {'ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        stmt = f"fallback_artifacts({tmp!r})"
+        setup = "from artifacts import fallback_artifacts"
+        print(f"{'fallback, cold':<22} {_fresh_ms(stmt, setup):>8.1f}  trains and persists")
+        warm = np.median([_fresh_ms(stmt, setup) for _ in range(args.repeat)])
+        print(f"{'fallback, warm':<22} {warm:>8.1f}  mmap from cache")
+    for label, stmt, path in (("pickle", "load_pickle()", MODEL_PATH),
+                              ("mmap export", "load_mmap()", os.path.join(MMAP_PATH, "manifest.json"))):
+        if os.path.exists(os.path.join(HERE, path)):
+            ms = np.median([_fresh_ms(stmt, "from artifacts import load_mmap, load_pickle")
+                            for _ in range(args.repeat)])
+            print(f"{label:<22} {ms:>8.1f}")
+    return 0
+
+
+# ── SUITE ──────────────────────────────────────────────────────
+BASELINE_PATH = "bench_baseline.json"
+# A metric may slow down by this many noise bands before it counts as a regression
+NOISE_BANDS   = 3
+# Explore's sweeps: elevation strip plus the four cards (app.sweep_axis)
+EXPLORE_SWEEPS = [(0, np.arange(1800, 3901, 30))] + [
+    (i, np.arange(PARAM_RANGES[i][0], PARAM_RANGES[i][1] + 1,
+                  max(1, (PARAM_RANGES[i][1] - PARAM_RANGES[i][0]) // 50))) for i in (0, 2, 3, 5)]
+DEFAULT_PARAMS = (2800, 180, 12, 200, 30, 1500, 1700, 212, 220, 142, "Rawah")
+
+
+def _page_ms(page, repeat, rerun_key=None):
+    """Script times (ms) of fresh AppTest runs of ``page`` (or of a slider rerun), first run dropped."""
+    from streamlit.testing.v1 import AppTest
+    times = []
+    for _ in range(repeat + 1):
+        at = AppTest.from_file(os.path.join(HERE, "app.py"), default_timeout=300)
+        at.query_params["page"] = page
+        t = time.perf_counter(); at.run(); dt = time.perf_counter() - t
+        if at.exception:
+            raise RuntimeError(f"{page}: {at.exception[0].value}")
+        if rerun_key:
+            slider = at.slider(key=rerun_key).set_value(30)
+            t = time.perf_counter(); slider.run(); dt = time.perf_counter() - t
+        times.append(dt)
+    return np.array(times[1:]) * 1e3
+
+
+def suite_metrics(args):
+    """``(metrics, noise)``: min-of-N milliseconds and relative noise band per metric.
+
+    The fallback model stands in when no artifacts exist.
+    """
+    from compress import served
+    os.chdir(HERE)
+    setup = "from artifacts import load_artifacts\nfrom compress import served"
+    stmt  = "served(*load_artifacts()[:2])"
+    runs  = {"model_load_cold_ms": np.array([_fresh_ms(stmt, setup) for _ in range(args.page_repeat)])}
+    runs["model_load_warm_ms"] = samples(lambda: served(*load_artifacts()[:2]), args.repeat)
+
+    model, scaler, features = load_artifacts()
+    scorer = served(model, scaler)
+    runs["predict_1_row_ms"] = samples(lambda: predict_batch(*scorer, features, [DEFAULT_PARAMS]), args.repeat)
+    for n in (64, 4096):
+        X = encode_rows(random_rows(n, seed=3), len(features))
+        runs[f"predict_{n}_rows_ms"] = samples(lambda: predict_batch(*scorer, features, X), args.repeat)
+    runs["explore_sweep_ms"] = samples(
+        lambda: predict_sweeps(*scorer, features, DEFAULT_PARAMS, EXPLORE_SWEEPS), args.repeat)
+
+    runs["page_classify_ms"]       = _page_ms("classify", args.page_repeat)
+    runs["page_explore_ms"]        = _page_ms("explore", args.page_repeat)
+    runs["page_classify_rerun_ms"] = _page_ms("classify", args.page_repeat, "cl_slp")
+    runs["page_explore_rerun_ms"]  = _page_ms("explore", args.page_repeat, "ex_slp")
+    stats = {name: floor_and_noise(t) for name, t in runs.items()}
+    return {k: v[0] for k, v in stats.items()}, {k: v[1] for k, v in stats.items()}
+
+
+def allowed_slowdown(name, threshold, noise, baseline_noise):
+    """Relative slowdown tolerated for ``name``: ``threshold``, widened to NOISE_BANDS noise bands."""
+    band = max(noise.get(name, 0.0), baseline_noise.get(name, 0.0))
+    return max(threshold, NOISE_BANDS * band)
+
+
+def regressions(current, baseline, threshold, min_delta_ms, noise=None, baseline_noise=None):
+    """Metrics slower than ``baseline * (1 + allowed)`` by at least ``min_delta_ms``.
+
+    ``allowed`` is ``threshold`` unless this run's or the baseline's noise
+    band for the metric calls for more (``allowed_slowdown``).
+    """
+    bad = []
+    for name, ms in current.items():
+        ref = baseline.get(name)
+        if ref is None:
+            continue
+        allowed = allowed_slowdown(name, threshold, noise or {}, baseline_noise or {})
+        if ms > ref * (1 + allowed) and ms - ref >= min_delta_ms:
+            bad.append(name)
+    return bad
+
+
+def bench_suite(args):
+    import platform
+    baseline, baseline_noise = {}, {}
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"no baseline at {args.baseline}; record one with --save", file=sys.stderr)
+            return 2
+        with open(args.baseline) as f:
+            record = json.load(f)
+        # baselines recorded before noise bands were kept fall back to --threshold alone
+        baseline, baseline_noise = record["metrics"], record.get("noise", {})
+
+    current, noise = suite_metrics(args)
+    bad = regressions(current, baseline, args.threshold, args.min_delta_ms, noise, baseline_noise)
+    print(f"{'metric':<24} {'ms':>9} {'noise':>6} {'baseline':>9} {'change':>8} {'allowed':>8}")
+    for name, ms in current.items():
+        ref  = baseline.get(name)
+        cols = (f"{ref:>9.2f} {ms / ref - 1:>+8.0%} "
+                f"{allowed_slowdown(name, args.threshold, noise, baseline_noise):>+8.0%}"
+                if ref else f"{'-':>9} {'-':>8} {'-':>8}")
+        print(f"{name:<24} {ms:>9.2f} {noise[name]:>6.0%} {cols}{'  REGRESSED' if name in bad else ''}")
+
+    record = dict(meta=dict(python=platform.python_version(), machine=platform.machine(),
+                            cpus=os.cpu_count(), model=MODEL_PATH if os.path.exists(MODEL_PATH) else "fallback",
+                            created=time.strftime("%Y-%m-%dT%H:%M:%S")),
+                  metrics=current, noise=noise)
+    for path in [p for p in (args.out, args.baseline if args.save else None) if p]:
+        with open(path, "w") as f:
+            json.dump(record, f, indent=1)
+        print(f"wrote {path}")
+    if bad:
+        print(f"{len(bad)} metric(s) regressed past their allowed slowdown: {', '.join(bad)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+# ── CHART PAYLOAD ──────────────────────────────────────────────
+def bench_charts(args):
+    """Bytes of Plotly JSON each page sends; on a slow link this, not script time, gates first paint."""
+    import gzip
+    from streamlit.testing.v1 import AppTest
+    print(f"{'page':<10} {'charts':>6} {'json B':>8} {'gzip B':>7}  per chart")
+    for page in ("classify", "explore"):
+        at = AppTest.from_file(os.path.join(HERE, "app.py"), default_timeout=300)
+        at.query_params["page"] = page
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{page}: {at.exception[0].value}")
+        specs = [c.proto.spec.encode() for c in at.get("plotly_chart")]
+        raw   = sum(map(len, specs))
+        gz    = sum(len(gzip.compress(s)) for s in specs)
+        print(f"{page:<10} {len(specs):>6} {raw:>8,} {gz:>7,}  {' '.join(str(len(s)) for s in specs)}")
+    return 0
+
+
+# ── ANYTIME ────────────────────────────────────────────────────
+def heldout_rows(path, n_features, n, seed=42):
+    """``(X, y)``: ``n`` rows of the training script's test split, in the model's column layout."""
+    from covtype_data import load_cached
+    data = load_cached(path)
+    _, test_idx = data.split(test_size=0.2, seed=seed)
+    rows = np.sort(np.random.default_rng(seed).choice(test_idx, min(n, len(test_idx)), replace=False))
+    X = data.compact_matrix(rows) if n_features == len(data.compact_names) else data.matrix(rows=rows)
+    return X.astype(np.float64), data.target[rows]
+
+
+def bench_anytime(args):
+    """Trees used, latency and agreement with the full forest for early-stopped scoring."""
+    model, scaler, features = load_estimator()
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+    if args.engine == "compiled":
+        model, scaler = CompiledForest.from_sklearn(model, scaler), None
+    if args.data:
+        X, y = heldout_rows(args.data, len(features), args.rows)
+    else:
+        X, y = encode_rows(random_rows(args.rows, seed=1), len(features)), None
+    full    = predict_batch(model, scaler, features, X)[1]
+    n_trees = len(getattr(model, "roots", getattr(model, "estimators_", ())))
+    print(f"{len(X)} {'held-out' if y is not None else 'random slider'} rows, {args.engine} engine, "
+          f"{n_trees} trees, chunk {args.chunk}")
+    print(f"{'mode':<14} {'trees':>6} {'agree':>7} {'mean|Δp|':>9} {'max|Δp|':>8} {'est. se':>8}"
+          f" {'accuracy':>9} {'batch ms':>9} {'row p50 ms':>11}")
+    modes = [("full", None, None)] + [(f"z={z:g}", z, None) for z in args.z] \
+          + [(f"budget {b:g}ms", None, b / 1e3) for b in args.budgets]
+    single = X[:args.single_rows]
+    for name, z, budget in modes:
+        if name == "full":
+            run = lambda A: predict_batch(model, scaler, features, A) + (np.full(len(A), n_trees), np.zeros(len(A)))
+        else:
+            run = lambda A, z=z, budget=budget: predict_anytime(model, scaler, features, A, z, budget, args.chunk)
+        _, probs, used, se = run(X)
+        dp  = np.abs(probs - full).max(axis=1)
+        acc = f"{(model.classes_[probs.argmax(1)] == y).mean():.4f}" if y is not None else "-"
+        t_batch = timeit(lambda: run(X), args.repeat)
+        t_row   = float(np.median([timeit(lambda r=r: run(r[None]), 3) for r in single]))
+        print(f"{name:<14} {used.mean():>6.1f} {(probs.argmax(1) == full.argmax(1)).mean():>7.4f}"
+              f" {dp.mean():>9.4f} {dp.max():>8.3f} {se.mean():>8.4f} {acc:>9} {t_batch:>9.1f} {t_row:>11.3f}")
+    return 0
+
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("engine", help="compiled forest parity and latency vs sklearn")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1, 64, 4096])
+    p.add_argument("--parity-rows", type=int, default=4096)
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--tol", type=float, default=1e-6)
+    p.set_defaults(fn=bench_engine)
+    p = sub.add_parser("artifacts", help="pickle vs memory-mapped load time and RSS")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_artifacts)
+    p = sub.add_parser("startup", help="import and model-load cost of a cold replica")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_startup)
+    p = sub.add_parser("suite", help="latency, sweep, model-load and page-render metrics vs a JSON baseline")
+    p.add_argument("--repeat", type=int, default=20, help="samples per in-process metric")
+    p.add_argument("--page-repeat", type=int, default=10,
+                   help="samples per page render and cold model load")
+    p.add_argument("--baseline", default=BASELINE_PATH)
+    p.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    p.add_argument("--check", action="store_true",
+                   help="exit 1 when a metric regresses past its allowed slowdown")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help=f"allowed relative slowdown (0.25 = 25%%), widened to {NOISE_BANDS} noise bands "
+                        "for noisy metrics")
+    p.add_argument("--min-delta-ms", type=float, default=0.5,
+                   help="ignore slowdowns smaller than this, whatever the ratio")
+    p.add_argument("--out", help="also write this run's results as JSON")
+    p.set_defaults(fn=bench_suite)
+    p = sub.add_parser("charts", help="Plotly JSON payload per page, raw and gzipped")
+    p.set_defaults(fn=bench_charts)
+    p = sub.add_parser("anytime", help="early-stopped forest scoring vs full predict_proba")
+    p.add_argument("--data", help="covtype.csv or covtype.data[.gz]; default: random slider inputs")
+    p.add_argument("--rows", type=int, default=5000)
+    p.add_argument("--single-rows", type=int, default=200, help="rows timed one at a time")
+    p.add_argument("--engine", choices=["sklearn", "compiled"], default="sklearn")
+    p.add_argument("--chunk", type=int, default=8, help="trees walked between stopping checks")
+    p.add_argument("--z", type=float, nargs="+", default=[2.0, 3.0, 4.0])
+    p.add_argument("--budgets", type=float, nargs="+", default=[2.0, 5.0],
+                   help="latency budgets in ms for the whole batch, stopping on time alone")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(fn=bench_anytime)
+    p = sub.add_parser("probe")
+    p.add_argument("fmt", choices=["pickle", "mmap"])
+    p.add_argument("--path"); p.add_argument("--model"); p.add_argument("--scaler")
+    p.add_argument("--n-features", type=int, default=54)
+    p.set_defaults(fn=probe_load)
+    args = ap.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
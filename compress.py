@@ -0,0 +1,245 @@
+"""Latency-aware compression of the trained model.
+
+    python compress.py [--data covtype.csv] [--out compressed] [--max-drop 0.01]
+
+Builds candidate models from the current artifacts:
+- fewer trees, or trees cut at a shallower depth (both via ``CompiledForest.prune``);
+- forests refit on the top-k features by importance;
+- single trees distilled from the model's own predictions.
+Every candidate is measured for accuracy, p50 / p99 single-row latency,
+batch throughput and artifact size, and the stage writes a Pareto table
+to ``<out>/pareto.csv``.
+
+The fastest candidate within ``--max-drop`` accuracy of the full model is
+published to ``forest_model_fast/``. The app serves it for Explore sweeps;
+Classify keeps the accurate model. With ``--data``, accuracy is measured
+on held-out covtype rows. Without it, accuracy is agreement with the full
+model on random slider inputs.
+"""
+import argparse, csv, itertools, os, sys, time
+
+import numpy as np
+
+from artifacts import (FAST_PATH, MMAP_PATH, MODEL_PATH, export_mmap, load_artifacts,
+                       load_estimator, model_stamp)
+from forest_engine import CompiledForest
+from inference import encode_rows, predict_batch
+
+LATENCY_ROWS = 300
+BATCH_ROWS   = 4096
+COLUMNS      = ["name", "trees", "depth", "features", "accuracy", "p50_ms", "p99_ms",
+                "rows_per_s", "size_mb", "pareto"]
+
+
+def load_teacher():
+    """The sklearn estimator when there is one (top-k needs its importances), else the served model."""
+    if os.path.exists(MODEL_PATH) or not os.path.exists(os.path.join(MMAP_PATH, "manifest.json")):
+        return load_estimator()
+    return load_artifacts()
+
+
+def served(model, scaler):
+    """``(model, scaler)`` the way the app scores it: compiled when possible."""
+    if isinstance(model, CompiledForest):
+        return model, None
+    try:
+        return CompiledForest.from_sklearn(model, scaler), None
+    except ValueError:
+        return model, scaler
+
+
+def predict_labels(model, scaler, X):
+    Xs = X if scaler is None else scaler.transform(X)
+    return np.asarray(model.predict(Xs))
+
+
+# ── DATA ───────────────────────────────────────────────────────
+def design(args, teacher, n_features):
+    """``(X_fit, y_fit, X_eval, y_eval)`` in the model's column layout (raw, unscaled)."""
+    if args.data:
+        from covtype_data import load_cached
+        data = load_cached(args.data)
+        train_idx, test_idx = data.split(test_size=0.2, seed=args.seed)
+        rng  = np.random.default_rng(args.seed)
+        fit  = np.sort(rng.choice(train_idx, min(args.fit_rows, len(train_idx)), replace=False))
+        ev   = np.sort(rng.choice(test_idx, min(args.eval_rows, len(test_idx)), replace=False))
+        mat  = data.compact_matrix if n_features == len(data.compact_names) else \
+            (lambda rows: data.matrix(rows=rows))
+        return (mat(fit).astype(np.float64), data.target[fit],
+                mat(ev).astype(np.float64), data.target[ev])
+    # no labelled data: the full model's predictions on slider inputs are the target
+    from benchmarks import random_rows
+    X_fit  = encode_rows(random_rows(args.fit_rows, seed=args.seed), n_features)
+    X_eval = encode_rows(random_rows(args.eval_rows, seed=args.seed + 1), n_features)
+    return X_fit, predict_labels(*teacher, X_fit), X_eval, predict_labels(*teacher, X_eval)
+
+
+# ── CANDIDATES ─────────────────────────────────────────────────
+def candidates(args, model, scaler, X_fit, y_fit, teacher):
+    """Yield ``(name, features_used, CompiledForest)`` for every compressed variant.
+
+    Refit candidates vote over the teacher's classes even when their fit
+    labels miss one, so probability columns line up with the served model.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+    engine, _ = served(model, scaler)
+    n_features = X_fit.shape[1]
+    classes    = engine.classes_
+
+    if isinstance(engine, CompiledForest):
+        trees  = [t for t in args.trees if t < engine.n_trees] + [None]
+        depths = [d for d in args.depths if d < engine.max_depth] + [None]
+        for t, d in itertools.product(trees, depths):
+            if t is None and d is None:
+                continue
+            name = "-".join(p for p in (t and f"trees{t}", d and f"depth{d}") if p)
+            yield name, n_features, engine.prune(n_trees=t, max_depth=d)
+
+    importances = getattr(model, "feature_importances_", None)
+    if importances is None:
+        print(f"top-k: {type(model).__name__} has no feature importances, skipped", file=sys.stderr)
+    else:
+        n_trees = min(getattr(engine, "n_trees", 50), 50)
+        for k in (k for k in args.topk if k < n_features):
+            cols = np.sort(np.argsort(importances)[::-1][:k])
+            rf   = RandomForestClassifier(n_estimators=n_trees, max_depth=args.topk_depth,
+                                          random_state=args.seed, n_jobs=-1)
+            rf.fit(X_fit[:, cols], y_fit)
+            topk = CompiledForest.from_sklearn(rf).remap_features(cols, n_features)
+            yield f"top{k}", k, topk.align_classes(classes)
+
+    # distillation: the full model labels the fit rows, a single tree imitates it
+    y_teacher = predict_labels(*teacher, X_fit)
+    for d in args.distill_depths:
+        tree = DecisionTreeClassifier(max_depth=d, random_state=args.seed).fit(X_fit, y_teacher)
+        yield f"distilled-depth{d}", n_features, CompiledForest.from_sklearn(tree).align_classes(classes)
+
+
+# ── MEASURE ────────────────────────────────────────────────────
+def _dir_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2**20
+    return sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(path) for f in fs) / 2**20
+
+
+def measure(model, scaler, features, X_eval, y_eval, repeat=5):
+    acc  = float((predict_labels(model, scaler, X_eval) == y_eval).mean())
+    rows = X_eval[:LATENCY_ROWS]
+    predict_batch(model, scaler, features, rows[:1])
+    lat  = []
+    for r in rows:
+        t = time.perf_counter(); predict_batch(model, scaler, features, r[None, :])
+        lat.append(time.perf_counter() - t)
+    batch = np.resize(X_eval, (BATCH_ROWS, X_eval.shape[1]))
+    runs  = []
+    for _ in range(repeat):
+        t = time.perf_counter(); predict_batch(model, scaler, features, batch)
+        runs.append(time.perf_counter() - t)
+    return dict(accuracy=acc, p50_ms=float(np.percentile(lat, 50)) * 1e3,
+                p99_ms=float(np.percentile(lat, 99)) * 1e3,
+                rows_per_s=BATCH_ROWS / float(np.median(runs)))
+
+
+def mark_pareto(rows):
+    """A row is on the front if no other row is at least as accurate and as fast, and strictly better in one."""
+    for r in rows:
+        r["pareto"] = not any(o is not r and o["accuracy"] >= r["accuracy"] and o["p50_ms"] <= r["p50_ms"]
+                              and (o["accuracy"] > r["accuracy"] or o["p50_ms"] < r["p50_ms"])
+                              for o in rows)
+    return rows
+
+
+def pick_fast(rows, max_drop):
+    full = next(r for r in rows if r["name"] == "full")
+    ok   = [r for r in rows if r["name"] != "full" and r["accuracy"] >= full["accuracy"] - max_drop]
+    return min(ok, key=lambda r: (r["p50_ms"], r["size_mb"])) if ok else None
+
+
+def write_table(rows, path):
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=COLUMNS)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: (f"{v:.6g}" if isinstance(v, float) else v) for k, v in r.items() if k in COLUMNS})
+
+
+def print_table(rows, fast):
+    print(f"{'candidate':<22} {'trees':>5} {'depth':>5} {'feats':>5} {'accuracy':>9} {'p50 ms':>7} "
+          f"{'p99 ms':>7} {'rows/s':>9} {'MB':>6}")
+    for r in sorted(rows, key=lambda r: r["p50_ms"]):
+        flag = (" *" if r["pareto"] else "  ") + (" fast" if fast is r else "")
+        print(f"{r['name']:<22} {r['trees']:>5} {r['depth']:>5} {r['features']:>5} {r['accuracy']:>9.4f} "
+              f"{r['p50_ms']:>7.3f} {r['p99_ms']:>7.3f} {r['rows_per_s']:>9,.0f} {r['size_mb']:>6.2f}{flag}")
+    print("* Pareto front (accuracy vs p50 latency)")
+
+
+def compress(args):
+    model, scaler, features = load_teacher()
+    teacher = served(model, scaler)
+    X_fit, y_fit, X_eval, y_eval = design(args, (model, scaler), len(features))
+    os.makedirs(args.out, exist_ok=True)
+
+    rows, engines = [], {}
+    def record(name, cand, cand_scaler, n_used, path):
+        m = measure(cand, cand_scaler, features, X_eval, y_eval)
+        compiled = isinstance(cand, CompiledForest)
+        rows.append(dict(name=name, trees=cand.n_trees if compiled else "-",
+                         depth=cand.max_depth if compiled else "-",
+                         features=n_used, size_mb=_dir_mb(path), **m))
+        print(f"  {name:<22} accuracy {m['accuracy']:.4f}  p50 {m['p50_ms']:.3f} ms", file=sys.stderr)
+
+    if isinstance(teacher[0], CompiledForest):
+        export_mmap(teacher[0], None, features, os.path.join(args.out, "full"))
+    else:
+        import joblib
+        joblib.dump(model, os.path.join(args.out, "full.pkl"))
+    record("full", *teacher, len(features),
+           os.path.join(args.out, "full" if isinstance(teacher[0], CompiledForest) else "full.pkl"))
+    for name, n_used, engine in candidates(args, model, scaler, X_fit, y_fit, teacher):
+        export_mmap(engine, None, features, os.path.join(args.out, name))
+        engines[name] = engine
+        record(name, engine, None, n_used, os.path.join(args.out, name))
+
+    mark_pareto(rows)
+    fast = pick_fast(rows, args.max_drop)
+    write_table(rows, os.path.join(args.out, "pareto.csv"))
+    print_table(rows, fast)
+    reference = "held-out covtype rows" if args.data else "agreement with the full model"
+    print(f"accuracy: {reference}; table -> {os.path.join(args.out, 'pareto.csv')}")
+
+    if fast is None:
+        print(f"no candidate within {args.max_drop} of the full model; nothing published")
+    elif args.publish:
+        publish(engines[fast["name"]], features, fast, args.fast_path)
+        print(f"published {fast['name']} -> {args.fast_path} (served for Explore sweeps)")
+    return 0
+
+
+def publish(engine, features, row, path=FAST_PATH):
+    # export_mmap swaps the directory in whole, so a running app keeps its mapped copy
+    export_mmap(engine, None, features, path, source_stamp=model_stamp(), candidate=row["name"],
+                accuracy=row["accuracy"], p50_ms=row["p50_ms"])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--data", help="covtype.csv or covtype.data[.gz]; default: random slider inputs")
+    ap.add_argument("--out", default="compressed", help="candidate artifacts and pareto.csv")
+    ap.add_argument("--trees", type=int, nargs="+", default=[10, 25, 50])
+    ap.add_argument("--depths", type=int, nargs="+", default=[8, 12, 16])
+    ap.add_argument("--topk", type=int, nargs="+", default=[10, 20])
+    ap.add_argument("--topk-depth", type=int, default=20)
+    ap.add_argument("--distill-depths", type=int, nargs="+", default=[10, 14])
+    ap.add_argument("--fit-rows", type=int, default=50_000)
+    ap.add_argument("--eval-rows", type=int, default=20_000)
+    ap.add_argument("--max-drop", type=float, default=0.01,
+                    help="accuracy the fast model may give up against the full model")
+    ap.add_argument("--fast-path", default=FAST_PATH)
+    ap.add_argument("--no-publish", dest="publish", action="store_false")
+    ap.add_argument("--seed", type=int, default=42)
+    return compress(ap.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+import time
+
+import numpy as np
+
+# ── COMPILED FOREST ────────────────────────────────────────────
+# Every tree of a fitted sklearn forest is flattened into one set of
+# contiguous node arrays. Leaves point at themselves, so a batch can be
+# walked for all trees at once with plain fancy indexing. A StandardScaler
+# is folded into the split thresholds, which lets callers pass raw,
+# unscaled feature rows.
+
+ROW_CHUNK = 1024
+
+
+class CompiledForest:
+
+    def __init__(self, feature, threshold, children, value, roots, classes,
+                 n_features_in, max_depth, is_leaf=None):
+        self.feature   = feature
+        self.threshold = threshold
+        # children[node] = (right, left), indexed by "went left"; leaves point at themselves
+        self.children  = children
+        self.value     = value
+        self.roots     = roots
+        self.classes_  = np.asarray(classes)
+        self.n_features_in_ = int(n_features_in)
+        self.max_depth = int(max_depth)
+        self.is_leaf   = children[:, 1] == np.arange(len(children)) if is_leaf is None else is_leaf
+        self._paths    = None
+
+    @property
+    def left(self):
+        return self.children[:, 1]
+
+    @property
+    def right(self):
+        return self.children[:, 0]
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """Compile a fitted forest or single tree; raises ``ValueError`` if unsupported."""
+        trees = getattr(model, "estimators_", None)
+        if trees is None:
+            trees = [model]
+        trees = list(np.ravel(trees))
+        if not trees or not all(hasattr(t, "tree_") and hasattr(t, "predict_proba") for t in trees):
+            raise ValueError(f"cannot compile {type(model).__name__}")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("multi-output forests are not supported")
+        mean, scale = _scaler_params(scaler, model.n_features_in_)
+
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+        for t in trees:
+            tr   = t.tree_
+            n    = tr.node_count
+            leaf = tr.children_left == -1
+            own  = np.arange(offset, offset + n)
+            f    = np.where(leaf, 0, tr.feature)
+            thr  = np.where(leaf, 0.0, _raw_thresholds(tr.threshold, scale[f], mean[f]))
+            v    = tr.value[:, 0, :].astype(np.float64)
+            feature.append(f.astype(np.int32))
+            threshold.append(thr)
+            left.append(np.where(leaf, own, tr.children_left + offset).astype(np.int32))
+            right.append(np.where(leaf, own, tr.children_right + offset).astype(np.int32))
+            value.append((v / v.sum(axis=1, keepdims=True)).astype(np.float32))
+            roots.append(offset)
+            offset += n
+
+        children = np.stack([np.concatenate(right), np.concatenate(left)], axis=1)
+        return cls(np.concatenate(feature), np.concatenate(threshold), children,
+                   np.concatenate(value), np.asarray(roots, dtype=np.int32),
+                   np.asarray(model.classes_), model.n_features_in_,
+                   max(t.tree_.max_depth for t in trees))
+
+    def prune(self, n_trees=None, max_depth=None):
+        """Smaller forest: the first ``n_trees`` trees, cut at ``max_depth``.
+
+        Nodes at the depth limit become leaves that keep their own class
+        distribution. Unreachable nodes are dropped, so the arrays shrink.
+        """
+        roots = self.roots[:n_trees]
+        cap   = self.max_depth if max_depth is None else min(max_depth, self.max_depth)
+        depth = np.zeros(len(self.feature), dtype=np.int32)
+        levels, frontier = [roots], roots
+        while len(levels) <= cap:
+            inner = frontier[~self.is_leaf[frontier]]
+            if not inner.size:
+                break
+            frontier = self.children[inner].ravel()
+            depth[frontier] = len(levels)
+            levels.append(frontier)
+        old    = np.sort(np.concatenate(levels))
+        new_of = np.zeros(len(self.feature), dtype=np.int32)
+        new_of[old] = np.arange(len(old), dtype=np.int32)
+        leaf     = self.is_leaf[old] | (depth[old] >= cap)
+        own      = np.arange(len(old), dtype=np.int32)
+        children = np.where(leaf[:, None], own[:, None], new_of[self.children[old]])
+        return CompiledForest(np.where(leaf, 0, self.feature[old]).astype(np.int32),
+                              np.where(leaf, 0.0, self.threshold[old]), children.astype(np.int32),
+                              np.ascontiguousarray(self.value[old]), new_of[roots], self.classes_,
+                              self.n_features_in_, len(levels) - 1, is_leaf=leaf)
+
+    def remap_features(self, columns, n_features_in):
+        """A forest fitted on ``X[:, columns]``, rewritten to read full-width rows."""
+        columns = np.asarray(columns, dtype=np.int32)
+        return CompiledForest(columns[self.feature], self.threshold, self.children, self.value,
+                              self.roots, self.classes_, n_features_in, self.max_depth,
+                              is_leaf=self.is_leaf)
+
+    def align_classes(self, classes):
+        """The same forest voting over ``classes``, a superset of its own, in that column order.
+
+        A forest fitted on labels that miss a class has no column for it, so
+        its argmax indices would shift against the full class set. Missing
+        classes get probability 0.
+        """
+        classes = np.asarray(classes)
+        idx     = np.searchsorted(classes, self.classes_)
+        if (idx >= len(classes)).any() or not np.array_equal(classes[idx], self.classes_):
+            raise ValueError(f"classes {self.classes_.tolist()} are not a subset of {classes.tolist()}")
+        value = np.zeros((len(self.value), len(classes)), dtype=self.value.dtype)
+        value[:, idx] = self.value
+        return CompiledForest(self.feature, self.threshold, self.children, value, self.roots, classes,
+                              self.n_features_in_, self.max_depth, is_leaf=self.is_leaf)
+
+    def apply(self, X, roots=None):
+        """Leaf index of every (row, tree) pair as an (N, n_trees) array; ``roots`` picks a subset of trees."""
+        roots = self.roots if roots is None else roots
+        X    = np.ascontiguousarray(X, dtype=np.float64)
+        (n, F), T = X.shape, len(roots)
+        flat = X.ravel()
+        node = np.tile(roots, n).astype(np.intp)
+        base = np.repeat(np.arange(n) * F, T)
+        live = np.flatnonzero(~self.is_leaf[node])
+        while live.size:
+            nd  = node[live]
+            go  = flat[base[live] + self.feature[nd]] <= self.threshold[nd]
+            nxt = self.children[nd, go.view(np.uint8)]
+            node[live] = nxt
+            live = live[~self.is_leaf[nxt]]
+        return node.reshape(n, T)
+
+    def predict_proba(self, X):
+        X   = np.asarray(X, dtype=np.float64)
+        out = np.empty((len(X), self.value.shape[1]))
+        for a in range(0, len(X), ROW_CHUNK):
+            leaves = self.apply(X[a:a + ROW_CHUNK])
+            out[a:a + ROW_CHUNK] = self.value[leaves].mean(axis=1, dtype=np.float64)
+        return out
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def path_index(self):
+        """Parent of every node (-1 at roots), for walking a leaf back to its root; built once and kept."""
+        if self._paths is None:
+            inner  = np.flatnonzero(~self.is_leaf).astype(np.int32)
+            parent = np.full(len(self.feature), -1, dtype=np.int32)
+            parent[self.children[inner, 0]] = inner
+            parent[self.children[inner, 1]] = inner
+            self._paths = parent
+        return self._paths
+
+    def contributions(self, X):
+        """Saabas attributions: ``(bias, contrib)`` with ``bias + contrib.sum(axis=1) == predict_proba(X)``.
+
+        ``contrib`` is ``(N, n_features_in_, C)``. Each split's change in the
+        class distribution is credited to the split's feature and averaged
+        over trees. ``bias`` is the mean root distribution.
+        """
+        parent = self.path_index()
+        X   = np.asarray(X, dtype=np.float64)
+        n, F, T = len(X), self.n_features_in_, self.n_trees
+        out = np.zeros((n * F, self.value.shape[1]))
+        for a in range(0, n, ROW_CHUNK):
+            node = self.apply(X[a:a + ROW_CHUNK]).ravel().astype(np.intp)
+            base = np.repeat(np.arange(a, a + len(node) // T) * F, T)
+            live = np.flatnonzero(parent[node] >= 0)
+            while live.size:
+                nd  = node[live]
+                par = parent[nd]
+                idx = base[live] + self.feature[par]
+                d   = self.value[nd] - self.value[par]
+                for c in range(d.shape[1]):  # bincount beats np.add.at by far on long index lists
+                    out[:, c] += np.bincount(idx, weights=d[:, c], minlength=len(out))
+                node[live] = par
+                live = live[parent[par] >= 0]
+        bias = self.value[self.roots].mean(axis=0, dtype=np.float64)
+        return bias, out.reshape(n, F, -1) / T
+
+    def tree_votes(self, X):
+        """Every tree's class distribution, ``(n_trees, N, C)``; its mean is ``predict_proba``."""
+        X   = np.asarray(X, dtype=np.float64)
+        out = np.empty((self.n_trees, len(X), self.value.shape[1]), dtype=self.value.dtype)
+        for a in range(0, len(X), ROW_CHUNK):
+            out[:, a:a + ROW_CHUNK] = self.value[self.apply(X[a:a + ROW_CHUNK]).T]
+        return out
+
+    def predict_proba_anytime(self, X, chunk=8, z=3.0, budget=None):
+        """``predict_proba`` that stops walking trees per row; see :func:`anytime_proba`."""
+        X = np.asarray(X, dtype=np.float64)
+        return anytime_proba(lambda rows, a, b: self.value[self.apply(X[rows], self.roots[a:b]).T],
+                             len(X), self.n_trees, chunk, z, budget)
+
+
+def _raw_thresholds(threshold, scale, mean):
+    """Raw-space thresholds that split exactly where sklearn's ``float32(scaled x) <= threshold`` does.
+
+    sklearn casts inputs to float32, so a split really sits at the rounding
+    boundary just above the largest float32 not over ``threshold``. Folding
+    ``threshold`` itself sends a row whose scaled value rounds onto it the
+    wrong way.
+    """
+    t32  = threshold.astype(np.float32)
+    t32  = np.where(t32 > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+    edge = (t32.astype(np.float64) + np.nextafter(t32, np.float32(np.inf)).astype(np.float64)) / 2
+    return edge * scale + mean
+
+
+def _scaler_params(scaler, n_features):
+    if scaler is None:
+        return np.zeros(n_features), np.ones(n_features)
+    if type(scaler).__name__ != "StandardScaler":
+        raise ValueError(f"cannot fold {type(scaler).__name__} into thresholds")
+    mean  = scaler.mean_  if scaler.mean_  is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+
+# ── ANYTIME ────────────────────────────────────────────────────
+def anytime_proba(walk, n, n_trees, chunk=8, z=3.0, budget=None, row_chunk=ROW_CHUNK):
+    """Class probabilities of ``n`` rows from only as many trees as each row needs.
+
+    ``walk(rows, a, b)`` returns the class distributions of trees ``a:b``
+    for the given row indices, as ``(b - a, len(rows), C)``. Trees are taken
+    ``chunk`` at a time. A row stops once the mean per-tree margin of its
+    leading class over the runner-up is more than ``z`` standard errors
+    above zero. The standard error uses the finite-population correction,
+    so it reaches zero at the full forest. With ``budget`` (seconds), every
+    row still open when the budget runs out stops after the current chunk;
+    ``z=None`` stops on the budget alone. Returns ``(probs, trees_used,
+    stderr)``. ``stderr`` is the largest per-class standard error of a row's
+    probabilities, and is 0 where every tree ran. Rows go through in blocks
+    of ``row_chunk``.
+    """
+    deadline = None if budget is None else time.perf_counter() + budget
+    out = []
+    for a in range(0, n, row_chunk):
+        out.append(_anytime_block(walk, np.arange(a, min(a + row_chunk, n)), n_trees, chunk, z, deadline))
+    if not out:
+        return np.empty((0, 0)), np.empty(0, dtype=np.int32), np.empty(0)
+    return tuple(np.concatenate(parts) for parts in zip(*out))
+
+
+def _anytime_block(walk, rows, T, chunk, z, deadline):
+    fpc   = lambda k: np.maximum(T - k, 0) / max(T - 1, 1) / np.maximum(k - 1, 1)
+    total = sq = None
+    used  = np.zeros(len(rows), dtype=np.int32)
+    live  = np.arange(len(rows))
+    for start in range(0, T, chunk):
+        v = walk(rows[live], start, start + chunk)
+        if total is None:
+            total, sq = np.zeros((len(rows), v.shape[2])), np.zeros((len(rows), v.shape[2]))
+        total[live] += v.sum(axis=0)
+        sq[live]    += (v * v).sum(axis=0)
+        used[live]  += len(v)
+        if used[live[0]] >= T or (deadline is not None and time.perf_counter() > deadline):
+            break
+        if z is None:
+            continue
+        k    = float(used[live[0]])  # open rows have all seen the same trees
+        mean = total[live] / k
+        sd   = np.sqrt(np.maximum(sq[live] / k - mean * mean, 0))
+        top  = np.argpartition(mean, mean.shape[1] - 2, axis=1)[:, -2:]
+        m2, s2 = np.take_along_axis(mean, top, 1), np.take_along_axis(sd, top, 1)
+        # sd(lead - second) <= sd(lead) + sd(second); equal when only those two get votes
+        se   = s2.sum(axis=1) * np.sqrt(fpc(k))
+        live = live[(k < 2) | (np.abs(m2[:, 1] - m2[:, 0]) <= z * se)]
+        if not live.size:
+            break
+    k    = used[:, None].astype(np.float64)
+    mean = total / k
+    var  = np.maximum(sq / k - mean * mean, 0).max(axis=1)
+    return mean, used, np.sqrt(var * fpc(k[:, 0]))
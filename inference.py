@@ -0,0 +1,605 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# ── SCHEMA ─────────────────────────────────────────────────────
+# Parameter order matches input_panel(); the model's base columns put
+# H_Dist_Fire last, so BASE_ORDER maps one onto the other.
+WILDERNESS = ["Rawah", "Neota", "Comanche Peak", "Cache la Poudre"]
+PARAMS     = ["elevation", "aspect", "slope", "h_hydro", "v_hydro",
+              "h_roads", "h_fire", "hs_9am", "hs_noon", "hs_3pm", "wilderness"]
+BASE_ORDER = [0, 1, 2, 3, 4, 5, 7, 8, 9, 6]
+PARAM_RANGES = [(1800, 3900), (0, 360), (0, 52), (0, 1400), (-150, 600),
+                (0, 7000), (0, 7000), (0, 254), (0, 254), (0, 254), (0, 3)]
+N_BASE, N_WILD, N_SOIL, N_CLASSES = 10, 4, 40, 7
+N_ONEHOT  = N_BASE + N_WILD + N_SOIL
+# Compact layout: the 10 base columns, then wilderness and soil as small ints
+N_COMPACT = N_BASE + 2
+COMPACT_NAMES = ["Wilderness", "Soil"]
+
+
+def param_matrix(rows):
+    """(N, 11) float matrix of input_panel parameters; wilderness as index."""
+    if isinstance(rows, np.ndarray):
+        return np.atleast_2d(rows).astype(float)
+    rows = list(rows)
+    P = np.empty((len(rows), len(PARAMS)))
+    for i, r in enumerate(rows):
+        w = r[10]
+        P[i, :10] = r[:10]
+        P[i, 10]  = WILDERNESS.index(w) if isinstance(w, str) else w
+    return P
+
+
+def encode_rows(rows, n_features):
+    """Encode parameter rows into the model's column layout.
+
+    ``n_features == 12`` selects the compact layout (wilderness and soil as
+    category indices); anything else gets the notebook's 54-column one-hot
+    layout. A 2-D array that already has ``n_features`` columns is taken as
+    encoded. Soil type is derived from elevation, as the single-row path
+    always did.
+    """
+    if isinstance(rows, np.ndarray) and rows.ndim == 2 and rows.shape[1] == n_features:
+        return rows.astype(float, copy=False)
+    P    = param_matrix(rows)
+    n    = len(P)
+    wild = P[:, 10].astype(int)
+    soil = (P[:, 0] // 100).astype(int) % N_SOIL
+    if n_features == N_COMPACT:
+        X = np.empty((n, N_COMPACT))
+        X[:, :N_BASE] = P[:, BASE_ORDER]
+        X[:, N_BASE], X[:, N_BASE + 1] = wild, soil
+        return X
+    idx = np.arange(n)
+    X   = np.zeros((n, max(n_features, N_ONEHOT)))
+    X[:, :N_BASE] = P[:, BASE_ORDER]
+    X[idx, N_BASE + wild] = 1
+    X[idx, N_BASE + N_WILD + soil] = 1
+    return X[:, :n_features]
+
+
+def compact_rows(X):
+    """Collapse 54-column one-hot rows into the 12-column compact layout."""
+    X   = np.asarray(X)
+    out = np.empty((len(X), N_COMPACT))
+    out[:, :N_BASE]   = X[:, :N_BASE]
+    out[:, N_BASE]     = X[:, N_BASE:N_BASE + N_WILD].argmax(axis=1)
+    out[:, N_BASE + 1] = X[:, N_BASE + N_WILD:N_ONEHOT].argmax(axis=1)
+    return out
+
+
+# Rows each thread has sent to a model; the app reports the growth per rerun
+_tally = threading.local()
+
+
+def rows_scored():
+    """Rows the calling thread has sent to a model so far; cache hits never get that far."""
+    return getattr(_tally, "rows", 0)
+
+
+def _count(n):
+    _tally.rows = rows_scored() + n
+
+
+def _score(model, scaler, X):
+    _count(len(X))
+    # scaler=None means the model takes raw rows (e.g. a CompiledForest)
+    if scaler is None:
+        Xs = X[:, :getattr(model, "n_features_in_", X.shape[1])]
+    else:
+        Xs = scaler.transform(X[:, :scaler.n_features_in_])
+    if hasattr(model, "predict_proba"):
+        probs = np.asarray(model.predict_proba(Xs), dtype=float)
+    else:
+        preds = np.asarray(model.predict(Xs)).astype(int)
+        probs = np.zeros((len(Xs), N_CLASSES)); probs[np.arange(len(Xs)), preds] = 1.0
+    if probs.shape[1] < N_CLASSES:
+        probs = np.pad(probs, ((0, 0), (0, N_CLASSES - probs.shape[1])))
+    return probs
+
+
+def predict_batch(model, scaler, feature_names, rows, cache=None):
+    """Score N rows in one pass; returns (classes, (N, 7) probabilities).
+
+    The class is the argmax of ``predict_proba``, so the trees are walked
+    once per batch instead of once for ``predict`` and again for the probs.
+    With a ``PredictionCache`` only rows not seen before reach the model.
+    """
+    X = encode_rows(rows, len(feature_names))
+    if cache is None:
+        probs = _score(model, scaler, X)
+        return probs.argmax(axis=1), probs
+    keys  = [("row", r.tobytes()) for r in X]
+    probs = np.empty((len(X), N_CLASSES))
+    miss  = []
+    for i, k in enumerate(keys):
+        hit = cache.get(k)
+        if hit is None: miss.append(i)
+        else:           probs[i] = hit
+    if miss:
+        fresh = _score(model, scaler, X[miss])
+        probs[miss] = fresh
+        for i, p in zip(miss, fresh):
+            cache.put(keys[i], p.copy())
+    return probs.argmax(axis=1), probs
+
+
+def predict_anytime(model, scaler, feature_names, rows, z=3.0, budget=None, chunk=8):
+    """``predict_batch`` for a tree forest that stops early per row.
+
+    Works on a ``CompiledForest`` or any sklearn forest with ``estimators_``
+    (see ``forest_engine.anytime_proba``). Returns ``(classes, probs,
+    trees_used, stderr)``. Every chunk of trees is another walk from the
+    roots, so it pays off from a few thousand rows up. Single rows and
+    Explore-sized sweeps are faster through ``predict_batch``.
+    """
+    from forest_engine import CompiledForest, anytime_proba
+    X = encode_rows(rows, len(feature_names))
+    if isinstance(model, CompiledForest):
+        probs, used, err = model.predict_proba_anytime(X[:, :model.n_features_in_], chunk, z, budget)
+    else:
+        trees = _forest_trees(model)
+        if trees is None:
+            raise ValueError(f"anytime scoring needs a tree forest, not {type(model).__name__}")
+        Xs = _tree_input(model, scaler, X)
+
+        def walk(r, a, b):
+            Xr = Xs[r]
+            return np.stack([t.predict_proba(Xr, check_input=False) for t in trees[a:b]])
+        # sklearn's walk is per call, not per row: one block keeps the calls few
+        probs, used, err = anytime_proba(walk, len(Xs), len(trees), chunk, z, budget, row_chunk=max(len(Xs), 1))
+    probs = _pad_classes(probs)
+    return probs.argmax(axis=1), probs, used, err
+
+
+def _forest_trees(model):
+    # sklearn forests of classification trees; boosting keeps regressors in estimators_
+    trees = getattr(model, "estimators_", None)
+    if trees is None or getattr(model, "n_outputs_", 1) != 1:
+        return None
+    trees = list(np.ravel(trees))
+    return trees if trees and all(hasattr(t, "tree_") and hasattr(t, "predict_proba") for t in trees) else None
+
+
+def _tree_input(model, scaler, X):
+    Xs = X[:, :model.n_features_in_] if scaler is None else scaler.transform(X[:, :scaler.n_features_in_])
+    return np.asarray(Xs, dtype=np.float32)
+
+
+def _pad_classes(a):
+    return np.pad(a, [(0, 0)] * (a.ndim - 1) + [(0, N_CLASSES - a.shape[-1])]) if a.shape[-1] < N_CLASSES else a
+
+
+# ── TREE SPREAD ────────────────────────────────────────────────
+# Quantiles of the per-tree class probabilities reported with the spread
+SPREAD_QUANTILES = (0.1, 0.9)
+
+
+def tree_votes(model, scaler, X):
+    """Every tree's class distribution for encoded rows, ``(n_trees, N, C)``, from one walk.
+
+    None for models that are not a forest of trees (e.g. histogram boosting).
+    """
+    from forest_engine import CompiledForest
+    if isinstance(model, CompiledForest):
+        _count(len(X))
+        return model.tree_votes(X[:, :model.n_features_in_])
+    trees = _forest_trees(model)
+    if trees is None:
+        return None
+    _count(len(X))
+    Xs = _tree_input(model, scaler, X)
+    return np.stack([t.predict_proba(Xs, check_input=False) for t in trees])
+
+
+def vote_spread(votes, quantiles=SPREAD_QUANTILES):
+    """``(probs, (std, lo, hi))`` across the tree axis of :func:`tree_votes`.
+
+    ``probs`` is the forest's own ``predict_proba``. ``std`` is how far the
+    trees spread around it, and ``lo`` / ``hi`` are the given quantiles.
+    """
+    lo, hi = np.quantile(votes, quantiles, axis=0)
+    return votes.mean(axis=0, dtype=np.float64), (votes.std(axis=0, dtype=np.float64), lo, hi)
+
+
+def predict_spread(model, scaler, feature_names, rows, cache=None):
+    """``predict_batch`` plus the trees' spread, from the same single walk.
+
+    Returns ``(classes, probs, spread)``. ``spread`` is ``(std, lo, hi)``,
+    each shaped like ``probs``, or None when the model has no trees to
+    poll. With a cache, the batch is stored as a whole.
+    """
+    X   = encode_rows(rows, len(feature_names))
+    key = ("spread", X.tobytes())
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    votes = tree_votes(model, scaler, X)
+    if votes is None:
+        probs, spread = _score(model, scaler, X), None
+    else:
+        probs, spread = vote_spread(votes)
+        probs, spread = _pad_classes(probs), tuple(_pad_classes(a) for a in spread)
+    result = probs.argmax(axis=1), probs, spread
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+# ── ATTRIBUTIONS ───────────────────────────────────────────────
+# Contributions are reported per input_panel parameter, plus the soil type
+# that encode_rows derives from elevation
+ATTR_INPUTS = PARAMS + ["soil"]
+
+
+def _input_groups(n_features):
+    """``(n_features, len(ATTR_INPUTS))`` 0/1 matrix folding model columns into inputs."""
+    G = np.zeros((n_features, len(ATTR_INPUTS)))
+    G[np.arange(N_BASE), BASE_ORDER] = 1
+    wild, soil = ((N_BASE, N_BASE + 1), (N_BASE + 1, N_BASE + 2)) if n_features == N_COMPACT else \
+        ((N_BASE, N_BASE + N_WILD), (N_BASE + N_WILD, N_ONEHOT))
+    G[slice(*wild), 10] = 1
+    G[slice(*soil), 11] = 1
+    return G[:n_features]
+
+
+def predict_contributions(forest, feature_names, rows, cache=None):
+    """Per-input Saabas contributions from a ``CompiledForest``.
+
+    Returns ``(probs, bias, contrib)``: ``contrib`` is ``(N, len(ATTR_INPUTS), 7)``
+    and ``bias + contrib.sum(axis=1)`` equals ``probs``. The one-hot
+    wilderness and soil columns are summed into one input each. With a
+    cache, the batch is stored as a whole next to the predictions.
+    """
+    X   = encode_rows(rows, len(feature_names))[:, :forest.n_features_in_]
+    key = ("contrib", X.tobytes())
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    bias, contrib = forest.contributions(X)
+    contrib = np.einsum("nfc,fg->ngc", contrib, _input_groups(X.shape[1]))
+    bias, contrib = _pad_classes(bias), _pad_classes(contrib)
+    result = bias + contrib.sum(axis=1), bias, contrib
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+# ── SWEEPS ─────────────────────────────────────────────────────
+def sweep_rows(base, sweeps):
+    """Stack the baseline row and one block per ``(param_idx, values)`` sweep."""
+    base   = param_matrix([base] if not isinstance(base, np.ndarray) else base)[0]
+    blocks = [base[None, :]]
+    for idx, xs in sweeps:
+        B = np.repeat(base[None, :], len(xs), axis=0)
+        B[:, idx] = xs
+        blocks.append(B)
+    return np.vstack(blocks)
+
+
+def predict_sweeps(model, scaler, feature_names, base, sweeps, cache=None, spread=False):
+    """Score the baseline and every sweep with a single model call.
+
+    Returns ``((pred, probs, spread), [(preds, probs, spread), ...])``: the
+    baseline result, then one triple per sweep, in order. ``spread`` is the
+    trees' ``(std, lo, hi)`` from :func:`predict_spread` when asked for and
+    available, else None. A cached result for the same baseline and sweep
+    definition is reused.
+    """
+    rows = sweep_rows(base, sweeps)
+    key  = ("sweep", rows[0].tobytes(),
+            tuple((idx, np.asarray(xs, dtype=float).tobytes()) for idx, xs in sweeps), spread)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    if spread:
+        preds, probs, band = predict_spread(model, scaler, feature_names, rows)
+    else:
+        (preds, probs), band = predict_batch(model, scaler, feature_names, rows), None
+    cut    = lambda a, b: None if band is None else tuple(x[a:b] for x in band)
+    bounds = np.cumsum([1] + [len(xs) for _, xs in sweeps])
+    parts  = [(preds[a:b], probs[a:b], cut(a, b)) for a, b in zip(bounds[:-1], bounds[1:])]
+    result = (int(preds[0]), probs[0], None if band is None else tuple(x[0] for x in band)), parts
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+# ── BOUNDARIES ─────────────────────────────────────────────────
+def find_boundaries(model, scaler, feature_names, base, axes, coarse=32, tol=1, cache=None):
+    """Class transitions along each ``(param_idx, lo, hi)`` axis, found by bisection.
+
+    Every axis starts from ``coarse`` even steps; an interval whose ends
+    disagree on the class is halved until it is ``tol`` wide, with one
+    batched model call per round for all axes together. A class that comes
+    and goes between two coarse steps is not seen. Returns ``(segments, rows,
+    rounds)``. ``segments`` holds, per axis, ``[(start, end, cls)]`` runs of
+    one class. Consecutive runs are at most ``tol`` apart, and that gap is
+    the exact interval holding the transition.
+    """
+    base = param_matrix([base] if not isinstance(base, np.ndarray) else base)[0]
+    key  = ("bounds", base.tobytes(), tuple(axes), coarse, tol)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    known = [{} for _ in axes]
+    def score(points):
+        P = np.repeat(base[None, :], len(points), axis=0)
+        for r, (k, x) in enumerate(points):
+            P[r, axes[k][0]] = x
+        for (k, x), c in zip(points, predict_batch(model, scaler, feature_names, P)[0]):
+            known[k][x] = int(c)
+
+    def is_open(k, a, b):
+        return b - a > tol and known[k][a] != known[k][b]
+
+    points = [(k, x) for k, (_, lo, hi) in enumerate(axes)
+              for x in np.unique(np.linspace(lo, hi, coarse + 1).round()).tolist()]
+    score(points)
+    rows, rounds = len(points), 1
+    open_ = [(k, a, b) for k in range(len(axes)) for a, b in
+             zip(sorted(known[k])[:-1], sorted(known[k])[1:]) if is_open(k, a, b)]
+    while open_:
+        mids   = [(k, a, (a + b) // 2 if tol >= 1 else (a + b) / 2, b) for k, a, b in open_]
+        points = sorted({(k, m) for k, _, m, _ in mids})
+        score(points)
+        rows, rounds = rows + len(points), rounds + 1
+        open_ = [iv for k, a, m, b in mids for iv in ((k, a, m), (k, m, b)) if is_open(*iv)]
+
+    segments = []
+    for k in range(len(axes)):
+        runs = []
+        for x in sorted(known[k]):
+            c = known[k][x]
+            if runs and runs[-1][2] == c:
+                runs[-1][1] = x
+            else:
+                runs.append([x, x, c])
+        segments.append([tuple(r) for r in runs])
+    result = segments, rows, rounds
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+# ── 2-D GRIDS ──────────────────────────────────────────────────
+def _lattice(n, stride):
+    return np.unique(np.r_[np.arange(0, n, stride), n - 1])
+
+
+def _lerp(V, lat, n, axis):
+    """Linear interpolation of ``V`` (sampled at indices ``lat`` along ``axis``) onto ``range(n)``."""
+    t = np.arange(n)
+    k = np.clip(np.searchsorted(lat, t, side="right") - 1, 0, max(len(lat) - 2, 0))
+    if len(lat) == 1:
+        return np.repeat(V, n, axis=axis)
+    w = ((t - lat[k]) / (lat[k + 1] - lat[k])).astype(V.dtype)
+    shape = [1] * V.ndim
+    shape[axis] = n
+    w = w.reshape(shape)
+    return np.take(V, k, axis=axis) * (1 - w) + np.take(V, k + 1, axis=axis) * w
+
+
+def refine_grid(score, ny, nx, n_classes=N_CLASSES, coarse=8, margin=0.05):
+    """Coarse-to-fine evaluation of an ``(ny, nx)`` lattice, one batched ``score`` call per round.
+
+    ``score(rows, cols)`` returns class probabilities for the given lattice
+    points. Round one scores every ``coarse``-th point. Each later round
+    halves the stride, but only blocks whose four corners disagree on the
+    class, or where a corner's top two classes are within ``margin``, are
+    scored. The others are filled by bilinear interpolation of
+    their corners, which keeps the corners' class. After each round the
+    generator yields ``(rows, cols, probs, exact)``. ``rows`` and ``cols``
+    index the current lattice, ``probs`` is the full ``(ny, nx, C)`` estimate
+    and ``exact`` marks the cells actually scored. The arrays are updated in
+    place by later rounds.
+    """
+    probs = np.zeros((ny, nx, n_classes), dtype=np.float32)
+    exact = np.zeros((ny, nx), dtype=bool)
+
+    def scored(rr, cc):
+        probs[rr, cc] = score(rr, cc)
+        exact[rr, cc] = True
+
+    def fill(rows, cols):
+        V = probs[np.ix_(rows, cols)]
+        probs[:] = _lerp(_lerp(V, rows, ny, 0), cols, nx, 1)
+
+    stride = 1 << max(int(coarse) - 1, 0).bit_length()
+    rows, cols = _lattice(ny, stride), _lattice(nx, stride)
+    rr, cc = np.meshgrid(rows, cols, indexing="ij")
+    scored(rr.ravel(), cc.ravel())
+    fill(rows, cols)
+    yield rows, cols, probs, exact
+
+    while stride > 1:
+        stride //= 2
+        V     = probs[np.ix_(rows, cols)]
+        cls   = V.argmax(axis=-1)
+        top2  = np.sort(V, axis=-1)[..., -2:]
+        close = top2[..., 1] - top2[..., 0] < margin
+        mixed = ((cls[:-1, :-1] != cls[1:, :-1]) | (cls[:-1, :-1] != cls[:-1, 1:])
+                 | (cls[:-1, :-1] != cls[1:, 1:])
+                 | close[:-1, :-1] | close[1:, :-1] | close[:-1, 1:] | close[1:, 1:])
+        new_rows, new_cols = _lattice(ny, stride), _lattice(nx, stride)
+        if mixed.size:
+            # a point on a block edge belongs to both neighbouring blocks
+            def blocks(lat, pts):
+                hi = len(lat) - 2
+                return (np.clip(np.searchsorted(lat, pts, side="left") - 1, 0, hi),
+                        np.clip(np.searchsorted(lat, pts, side="right") - 1, 0, hi))
+            (ra, rb), (ca, cb) = blocks(rows, new_rows), blocks(cols, new_cols)
+            need = (mixed[np.ix_(ra, ca)] | mixed[np.ix_(ra, cb)]
+                    | mixed[np.ix_(rb, ca)] | mixed[np.ix_(rb, cb)])
+            need &= ~exact[np.ix_(new_rows, new_cols)]
+            i, j = np.nonzero(need)
+            if len(i):
+                scored(new_rows[i], new_cols[j])
+        rows, cols = new_rows, new_cols
+        fill(rows, cols)
+        yield rows, cols, probs, exact
+
+
+def predict_grid(model, scaler, feature_names, base, x_axis, y_axis, coarse=8, cache=None):
+    """Class probabilities over two swept inputs, refined round by round.
+
+    ``x_axis`` and ``y_axis`` are ``(param_idx, values)``; everything else
+    stays at ``base``. Yields what :func:`refine_grid` yields. A finished
+    grid goes into ``cache`` under the baseline and both axes, and a cache
+    hit yields it once.
+    """
+    (ix, xs), (iy, ys) = x_axis, y_axis
+    base = param_matrix([base] if not isinstance(base, np.ndarray) else base)[0]
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    key = ("grid", base.tobytes(), ix, xs.tobytes(), iy, ys.tobytes(), coarse)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            yield hit
+            return
+
+    def score(rr, cc):
+        P = np.repeat(base[None, :], len(rr), axis=0)
+        P[:, ix], P[:, iy] = xs[cc], ys[rr]
+        return predict_batch(model, scaler, feature_names, P)[1]
+
+    for state in refine_grid(score, len(ys), len(xs), coarse=coarse):
+        yield state
+    if cache is not None:
+        cache.put(key, tuple(a.copy() for a in state))
+
+
+# ── PREFETCH ───────────────────────────────────────────────────
+class SweepPrefetcher:
+    """Background sweeps on one bounded thread pool shared by all sessions.
+
+    Each session keeps its job in ``slot`` (its session state), so a slot
+    holds at most one job. A new baseline cancels the job that has not
+    started yet, so a user dragging a slider leaves at most one job queued
+    and one running, and the FIFO queue serves sessions in turn. Beyond
+    ``max_queued`` waiting jobs, new work is dropped and the page computes
+    it on demand.
+    """
+
+    def __init__(self, workers=2, max_queued=32):
+        from concurrent.futures import ThreadPoolExecutor
+        self.pool       = ThreadPoolExecutor(workers, thread_name_prefix="forestiq-sweeps")
+        self.max_queued = max_queued
+        self.submitted  = self.cancelled = self.dropped = 0
+        self._queued    = 0
+        self._lock      = threading.Lock()
+
+    def submit(self, slot, key, fn, *args):
+        job = slot.get("sweep_job")
+        if job is not None and job[0] == key:
+            return job[1]
+        if job is not None and job[1].cancel():
+            with self._lock:
+                self._queued    -= 1
+                self.cancelled += 1
+        with self._lock:
+            if self._queued >= self.max_queued:
+                self.dropped += 1
+                slot.pop("sweep_job", None)
+                return None
+            self._queued   += 1
+            self.submitted += 1
+        fut = self.pool.submit(self._run, fn, args)
+        slot["sweep_job"] = (key, fut)
+        return fut
+
+    def _run(self, fn, args):
+        with self._lock:
+            self._queued -= 1
+        return fn(*args)
+
+    def result(self, slot, key):
+        """The job's result for ``key``; None when there is none, it failed or it never started.
+
+        A job still waiting in the queue is cancelled, not awaited, so a page
+        never waits behind other sessions' jobs; the caller computes it
+        inline. Only a job that is already running is waited for.
+        """
+        job = slot.get("sweep_job")
+        if job is None or job[0] != key:
+            return None
+        if job[1].cancel():
+            with self._lock:
+                self._queued   -= 1
+                self.cancelled += 1
+            slot.pop("sweep_job", None)
+            return None
+        try:
+            return job[1].result()
+        except Exception:
+            return None
+
+    def stats(self):
+        with self._lock:
+            return dict(queued=self._queued, submitted=self.submitted,
+                        cancelled=self.cancelled, dropped=self.dropped)
+
+
+# ── CACHE ──────────────────────────────────────────────────────
+class PredictionCache:
+    """Bounded, thread-safe LRU of prediction results shared across sessions.
+
+    Keys are encoded rows or sweep definitions; ``bind`` drops everything when
+    the model behind the cache changes. Cached arrays are made read-only.
+    """
+
+    def __init__(self, maxsize=2048):
+        self.maxsize    = maxsize
+        self.hits       = self.misses = self.evictions = 0
+        self._data      = OrderedDict()
+        self._lock      = threading.Lock()
+        self._model_key = None
+
+    def bind(self, model_key):
+        with self._lock:
+            if model_key != self._model_key:
+                self._data.clear()
+                self._model_key = model_key
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        _freeze(value)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(size=len(self._data), maxsize=self.maxsize, hits=self.hits,
+                        misses=self.misses, evictions=self.evictions)
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
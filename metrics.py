@@ -0,0 +1,142 @@
+"""Opt-in timing spans for the app, with a Prometheus text export.
+
+    FORESTIQ_METRICS=/var/lib/node_exporter/forestiq.prom   # rewrite this file after each rerun
+    FORESTIQ_METRICS_PORT=9464                              # also serve http://127.0.0.1:9464/metrics
+    FORESTIQ_METRICS_HOST=0.0.0.0                           # bind address for the port (default loopback)
+    ?debug=1                                                # per-rerun breakdown panel on the page
+
+With none of these set, ``Timer.span`` hands out one shared no-op context
+manager and nothing is recorded or exported.
+"""
+import contextlib, os, threading, time
+
+EXPORT_PATH = os.environ.get("FORESTIQ_METRICS")
+EXPORT_PORT = os.environ.get("FORESTIQ_METRICS_PORT")
+# Loopback unless a remote scraper is explicitly let in
+EXPORT_HOST = os.environ.get("FORESTIQ_METRICS_HOST", "127.0.0.1")
+ENABLED     = bool(EXPORT_PATH or EXPORT_PORT)
+# Seconds; Streamlit reruns sit between a few ms and a few s
+BUCKETS     = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = contextlib.nullcontext()
+
+
+class Timer:
+    """Named spans of one script run; a disabled timer records nothing."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans   = []
+        self.t0      = time.perf_counter()
+
+    def span(self, name):
+        return self._span(name) if self.enabled else _NOOP
+
+    @contextlib.contextmanager
+    def _span(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, time.perf_counter() - t))
+
+    def elapsed(self):
+        return time.perf_counter() - self.t0
+
+    def breakdown(self):
+        """``[(stage, seconds, calls)]`` with repeated spans summed, in first-seen order."""
+        out = {}
+        for name, s in self.spans:
+            tot, n = out.get(name, (0.0, 0))
+            out[name] = (tot + s, n + 1)
+        return [(k, s, n) for k, (s, n) in out.items()]
+
+
+class Registry:
+    """Process-wide histograms and counters, rendered in Prometheus text format."""
+
+    HELP = {
+        "forestiq_page_seconds":     ("histogram", "Script run time per page."),
+        "forestiq_stage_seconds":    ("histogram", "Time per instrumented stage and page."),
+        "forestiq_predictions_total": ("counter", "Rows scored, per page."),
+    }
+
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self._hist     = {}
+        self._counters = {}
+
+    def observe(self, metric, seconds, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            h = self._hist.setdefault(key, [0] * len(BUCKETS) + [0.0, 0])
+            for i, b in enumerate(BUCKETS):
+                if seconds <= b:
+                    h[i] += 1
+            h[-2] += seconds
+            h[-1] += 1
+
+    def inc(self, metric, n=1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def record(self, page, timer, predictions=0):
+        """Fold one finished rerun into the histograms and export if configured."""
+        self.observe("forestiq_page_seconds", timer.elapsed(), page=page)
+        for stage, s, _ in timer.breakdown():
+            self.observe("forestiq_stage_seconds", s, page=page, stage=stage)
+        if predictions:
+            self.inc("forestiq_predictions_total", predictions, page=page)
+        if EXPORT_PATH:
+            self.write(EXPORT_PATH)
+
+    def render(self):
+        with self._lock:
+            hist, counters = dict(self._hist), dict(self._counters)
+        lines = []
+        for metric, (kind, help_) in self.HELP.items():
+            lines += [f"# HELP {metric} {help_}", f"# TYPE {metric} {kind}"]
+            for (m, labels), h in sorted(hist.items()):
+                if m != metric:
+                    continue
+                for b, n in zip(BUCKETS + ("+Inf",), h[:len(BUCKETS)] + [h[-1]]):
+                    lines.append(f"{metric}_bucket{_labels(labels, le=b)} {n}")
+                lines.append(f"{metric}_sum{_labels(labels)} {h[-2]:.6f}")
+                lines.append(f"{metric}_count{_labels(labels)} {h[-1]}")
+            for (m, labels), n in sorted(counters.items()):
+                if m == metric:
+                    lines.append(f"{metric}{_labels(labels)} {n}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Atomically rewrite ``path``; readers never see a partial file."""
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port, host=EXPORT_HOST):
+        """Serve ``/metrics`` on ``host:port`` from a daemon thread; loopback only by default."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode()
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _labels(labels, **extra):
+    items = list(labels) + [(k, v) for k, v in extra.items()]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
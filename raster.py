@@ -0,0 +1,248 @@
+"""Cover-type maps for whole elevation grids, scored tile by tile.
+
+    python raster.py score dem.npy --cell 30 --h-hydro hydro.npy --h-roads roads.npy --out map
+    python raster.py synth demo --size 2000          # synthetic DEM + distance layers to try it on
+
+Inputs are 2-D ``.npy`` grids, opened memory-mapped, on one shared cell
+size. The elevation grid is required. Each distance layer (h_hydro,
+v_hydro, h_roads, h_fire) and the wilderness area is either a grid of the
+same shape or a constant. Slope, aspect and the 9am / noon / 3pm
+hillshade come from the elevation with Horn's 3x3 stencil, so one tile
+needs only a one-cell halo. Each tile is turned into input_panel
+parameter rows and scored through the current artifacts. The results
+are written into memory-mapped ``class.npy`` (uint8 model labels, i.e.
+Cover_Type 1-7 as in ``score.py``; 255 marks nodata) and
+``confidence.npy`` (float32) under ``--out``. A cell whose 3x3 stencil
+touches nodata is itself nodata. Peak memory depends on ``--tile``, not
+on the grid size.
+"""
+import argparse, json, os, resource, sys, time
+
+import numpy as np
+
+from artifacts import load_artifacts, load_fast, model_stamp
+from inference import N_CLASSES, WILDERNESS, predict_batch
+
+NODATA_CLASS = 255
+# Sun (azimuth, altitude) in degrees near the summer solstice at 40.6°N, the
+# Roosevelt NF; covtype's hillshade indices were computed for that date
+SUN = {"hs_9am": (97.0, 48.0), "hs_noon": (180.0, 73.0), "hs_3pm": (263.0, 48.0)}
+# input_panel defaults, used for any layer given neither as a grid nor a constant
+DEFAULTS = dict(h_hydro=300, v_hydro=30, h_roads=1200, h_fire=1700, wilderness="Rawah")
+LAYERS   = ["h_hydro", "v_hydro", "h_roads", "h_fire"]
+
+
+# ── TERRAIN ────────────────────────────────────────────────────
+def window(grid, r0, r1, c0, c1, halo=1):
+    """``grid[r0:r1, c0:c1]`` with a ``halo``-cell border, edge-replicated outside the grid."""
+    R0, R1 = max(r0 - halo, 0), min(r1 + halo, grid.shape[0])
+    C0, C1 = max(c0 - halo, 0), min(c1 + halo, grid.shape[1])
+    w = np.asarray(grid[R0:R1, C0:C1], dtype=np.float64)
+    pad = ((halo - (r0 - R0), halo - (R1 - r1)), (halo - (c0 - C0), halo - (C1 - c1)))
+    return np.pad(w, pad, mode="edge") if any(p for side in pad for p in side) else w
+
+
+def terrain(z, cell):
+    """Slope and aspect (degrees) of the interior of ``z``, a tile with a one-cell halo.
+
+    Horn's method, rows running north to south: aspect is the compass
+    direction the slope faces, 0 on flat ground as in covtype.
+    """
+    a, b, c = z[:-2, :-2], z[:-2, 1:-1], z[:-2, 2:]
+    d,    f = z[1:-1, :-2],              z[1:-1, 2:]
+    g, h, i = z[2:, :-2],  z[2:, 1:-1],  z[2:, 2:]
+    dzdx = ((c + 2 * f + i) - (a + 2 * d + g)) / (8 * cell)    # rises eastward
+    dzdy = ((g + 2 * h + i) - (a + 2 * b + c)) / (8 * cell)    # rises southward
+    slope  = np.degrees(np.arctan(np.hypot(dzdx, dzdy)))
+    # downhill points along (-dzdx east, +dzdy north); compass angle from north
+    aspect = np.degrees(np.arctan2(-dzdx, dzdy)) % 360
+    aspect[(dzdx == 0) & (dzdy == 0)] = 0
+    return slope, aspect
+
+
+def hillshade(slope, aspect, azimuth, altitude):
+    """0-254 illumination index, the same scale as the covtype columns."""
+    zen = np.radians(90 - altitude)
+    s, asp = np.radians(slope), np.radians(aspect)
+    hs = 255 * (np.cos(zen) * np.cos(s) + np.sin(zen) * np.sin(s) * np.cos(np.radians(azimuth) - asp))
+    return np.clip(np.rint(hs), 0, 254)
+
+
+# ── SCORING ────────────────────────────────────────────────────
+def layer(spec, shape, name):
+    """A memory-mapped grid for a ``.npy`` path, else a constant."""
+    if isinstance(spec, str) and spec.endswith(".npy"):
+        grid = np.load(spec, mmap_mode="r")
+        if grid.shape != shape:
+            raise ValueError(f"{name}: grid {grid.shape} does not match elevation {shape}")
+        return grid
+    if name == "wilderness":
+        return WILDERNESS.index(spec) if spec in WILDERNESS else int(spec)
+    return float(spec)
+
+
+def tile_params(elev, layers, r0, r1, c0, c1, cell):
+    """``(P, valid)``: input_panel parameter rows for one tile plus its nodata mask."""
+    z = window(elev, r0, r1, c0, c1)
+    finite = np.isfinite(z)
+    # a cell is valid only if its whole 3x3 stencil is; this depends on the
+    # grid alone, never on where the tile edges fall
+    valid = np.logical_and.reduce([finite[i:i + r1 - r0, j:j + c1 - c0]
+                                   for i in range(3) for j in range(3)])
+    if not finite.all():
+        z = np.where(finite, z, 0.0)
+    slope, aspect = terrain(z, cell)
+    cols = dict(elevation=z[1:-1, 1:-1], aspect=aspect, slope=slope,
+                **{k: hillshade(slope, aspect, *sun) for k, sun in SUN.items()})
+    for name in LAYERS + ["wilderness"]:
+        v = layers[name]
+        cols[name] = np.asarray(v[r0:r1, c0:c1], dtype=np.float64) if isinstance(v, np.ndarray) else v
+    order = ["elevation", "aspect", "slope", "h_hydro", "v_hydro", "h_roads", "h_fire",
+             "hs_9am", "hs_noon", "hs_3pm", "wilderness"]
+    P = np.empty(valid.shape + (len(order),))
+    for k, name in enumerate(order):
+        P[..., k] = cols[name]
+    P[~valid] = np.nan
+    return P.reshape(-1, len(order)), valid.ravel()
+
+
+def score_grid(model, scaler, features, elev, layers, out, cell, tile=256, terrain_out=False,
+               progress=None):
+    """Score ``elev`` tile by tile into memory-mapped outputs under ``out``.
+
+    ``class.npy`` holds the model's own labels (``classes_``; Cover_Type
+    1-7 for covtype), as ``score.py`` writes them, not argmax indices.
+    """
+    labels = np.asarray(getattr(model, "classes_", np.arange(N_CLASSES)))
+    os.makedirs(out, exist_ok=True)
+    H, W = elev.shape
+    open_out = lambda name, dtype: np.lib.format.open_memmap(
+        os.path.join(out, f"{name}.npy"), mode="w+", dtype=dtype, shape=(H, W))
+    classes, conf = open_out("class", np.uint8), open_out("confidence", np.float32)
+    extra = {k: open_out(k, np.float32) for k in ("slope", "aspect", *SUN)} if terrain_out else {}
+
+    tiles = [(r, c) for r in range(0, H, tile) for c in range(0, W, tile)]
+    for n, (r0, c0) in enumerate(tiles, 1):
+        r1, c1 = min(r0 + tile, H), min(c0 + tile, W)
+        P, valid = tile_params(elev, layers, r0, r1, c0, c1, cell)
+        cls  = np.full(len(P), NODATA_CLASS, dtype=np.uint8)
+        prob = np.zeros(len(P), dtype=np.float32)
+        if valid.any():
+            preds, probs = predict_batch(model, scaler, features, P[valid])
+            cls[valid]  = labels[preds]
+            prob[valid] = probs.max(axis=1)
+        classes[r0:r1, c0:c1] = cls.reshape(r1 - r0, c1 - c0)
+        conf[r0:r1, c0:c1]    = prob.reshape(r1 - r0, c1 - c0)
+        for k, col in zip(("aspect", "slope", *SUN), (1, 2, 7, 8, 9)):
+            if k in extra:
+                extra[k][r0:r1, c0:c1] = P[:, col].reshape(r1 - r0, c1 - c0)
+        if progress:
+            progress(n, len(tiles))
+    for m in (classes, conf, *extra.values()):
+        m.flush()
+    return classes, conf
+
+
+def score(args):
+    elev = np.load(args.elevation, mmap_mode="r")
+    if elev.ndim != 2:
+        print(f"{args.elevation}: expected a 2-D grid, got shape {elev.shape}", file=sys.stderr)
+        return 2
+    if args.nodata is not None:
+        # nodata sentinel -> NaN, through a float32 copy written band by band
+        os.makedirs(args.out, exist_ok=True)
+        src  = elev
+        elev = np.lib.format.open_memmap(os.path.join(args.out, "elevation_nan.npy"), mode="w+",
+                                         dtype=np.float32, shape=src.shape)
+        for r in range(0, src.shape[0], args.tile):
+            block = np.array(src[r:r + args.tile], dtype=np.float32)
+            block[block == args.nodata] = np.nan
+            elev[r:r + args.tile] = block
+    layers = {name: layer(getattr(args, name), elev.shape, name) for name in LAYERS + ["wilderness"]}
+
+    fast = load_fast(model_stamp()) if args.fast else None
+    model, scaler, features = (fast[0], None, fast[2]) if fast is not None else load_artifacts()
+    if args.fast and fast is None:
+        print("no current fast model (compress.py); using the full model", file=sys.stderr)
+
+    def progress(n, total):
+        if n == total or n % max(1, total // 20) == 0:
+            print(f"  tile {n}/{total}", file=sys.stderr)
+
+    t = time.perf_counter()
+    classes, conf = score_grid(model, scaler, features, elev, layers, args.out, args.cell,
+                               args.tile, args.terrain, progress)
+    dt = time.perf_counter() - t
+    counts = np.zeros(256, dtype=np.int64)
+    for r in range(0, classes.shape[0], args.tile):
+        counts += np.bincount(np.asarray(classes[r:r + args.tile]).ravel(), minlength=256)
+    with open(os.path.join(args.out, "manifest.json"), "w") as f:
+        json.dump(dict(shape=list(classes.shape), cell=args.cell, tile=args.tile,
+                       model_stamp=model_stamp(), fast=fast is not None,
+                       class_counts={int(k): int(v) for k, v in enumerate(counts) if v}), f, indent=1)
+    cells = classes.size
+    print(f"{cells:,} cells in {dt:.1f}s ({cells / dt:,.0f} cells/s), "
+          f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB -> {args.out}")
+    for k, v in enumerate(counts):
+        if v:
+            label = "nodata" if k == NODATA_CLASS else f"label {k}"
+            print(f"  {label:>8}: {v / cells:6.1%}")
+    return 0
+
+
+# ── SYNTHETIC INPUTS ───────────────────────────────────────────
+def synth(args):
+    """A smooth random DEM in the covtype elevation range plus distance grids."""
+    rng = np.random.default_rng(args.seed)
+    n   = args.size
+    os.makedirs(args.out, exist_ok=True)
+    dem = np.lib.format.open_memmap(os.path.join(args.out, "elevation.npy"), mode="w+",
+                                    dtype=np.float32, shape=(n, n))
+    hyd = np.lib.format.open_memmap(os.path.join(args.out, "h_hydro.npy"), mode="w+",
+                                    dtype=np.float32, shape=(n, n))
+    # a few broad sine ridges; written in row bands so memory stays flat
+    waves = [(rng.uniform(0.5, 4) * 2 * np.pi / n, rng.uniform(0.5, 4) * 2 * np.pi / n,
+              rng.uniform(0, 2 * np.pi), rng.uniform(0.3, 1)) for _ in range(6)]
+    cols  = np.arange(n)
+    for r in range(0, n, 512):
+        rows = np.arange(r, min(r + 512, n))[:, None]
+        z = sum(a * np.sin(kx * cols[None, :] + ky * rows + ph) for kx, ky, ph, a in waves)
+        z = (z / sum(w[-1] for w in waves) + 1) / 2
+        dem[r:r + len(rows)] = 1800 + 2100 * z
+        # streams in the valleys: distance grows with height above the local low
+        hyd[r:r + len(rows)] = np.clip((z - 0.2) * 1400, 0, 1400)
+    dem.flush(); hyd.flush()
+    print(f"wrote {n}x{n} elevation.npy and h_hydro.npy to {args.out}; try:\n"
+          f"  python raster.py score {args.out}/elevation.npy --h-hydro {args.out}/h_hydro.npy "
+          f"--out {args.out}/map")
+    return 0
+
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("score", help="cover-type and confidence maps for an elevation grid")
+    p.add_argument("elevation", help="2-D .npy elevation grid in metres, north up")
+    p.add_argument("--cell", type=float, default=30.0, help="cell size in metres (covtype: 30)")
+    for name in LAYERS:
+        p.add_argument(f"--{name.replace('_', '-')}", dest=name, default=DEFAULTS[name],
+                       help=f".npy grid or constant (default {DEFAULTS[name]})")
+    p.add_argument("--wilderness", default=DEFAULTS["wilderness"],
+                   help=".npy grid of area indices 0-3, or a name / index")
+    p.add_argument("--nodata", type=float, help="elevation value marking missing cells (NaN always is)")
+    p.add_argument("--tile", type=int, default=256, help="tile edge in cells; bounds peak memory")
+    p.add_argument("--terrain", action="store_true", help="also write slope, aspect and hillshade grids")
+    p.add_argument("--fast", action="store_true", help="score with the compressed model (compress.py)")
+    p.add_argument("--out", default="raster_out")
+    p.set_defaults(fn=score)
+    p = sub.add_parser("synth", help="write a synthetic DEM and hydrology grid")
+    p.add_argument("out")
+    p.add_argument("--size", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(fn=synth)
+    args = ap.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
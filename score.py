@@ -0,0 +1,182 @@
+"""Score a covtype-schema CSV outside the Streamlit UI.
+
+    python score.py covtype.csv.gz predictions.csv.gz --workers 8 --chunksize 100000
+
+The input is streamed in fixed-size chunks and scored on a process pool with
+exactly the artifacts named on the command line (``--model`` / ``--scaler``
+/ ``--features``, or ``--mmap DIR``); missing files are an error, never the
+synthetic fallback. The scaler may only be absent for compact-layout models
+or with ``--no-scaler``. Predictions (``pred`` is the Cover_Type label) are
+written in input order as they complete, so memory stays bounded by
+``chunksize * workers * 2`` rows.
+
+With ``--anytime Z`` (random forests only) each row stops walking trees
+once its leading class is ``Z`` standard errors clear of the runner-up; a
+``trees`` column records how many it used.
+"""
+import argparse, collections, gzip, json, os, re, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from artifacts import FEATURES_PATH, MODEL_PATH, SCALER_PATH, load_mmap, load_pickle
+from inference import (N_BASE, N_CLASSES, N_COMPACT, N_SOIL, N_WILD, compact_rows, predict_anytime,
+                       predict_batch)
+
+_worker = {}
+
+
+def _init_worker(model_path, scaler_path, features_path, mmap_path=None, anytime=None):
+    model, scaler, features = (load_mmap(mmap_path) if mmap_path else
+                               load_pickle(model_path, scaler_path, features_path))
+    # One process per core already; a forest trained with n_jobs=-1 would oversubscribe
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+    classes = np.asarray(getattr(model, "classes_", np.arange(N_CLASSES)))
+    _worker.update(model=model, scaler=scaler, features=features, classes=classes, anytime=anytime)
+
+
+def _score_chunk(X):
+    if _worker["anytime"] is not None:
+        preds, probs, used, _ = predict_anytime(_worker["model"], _worker["scaler"], _worker["features"], X,
+                                                z=_worker["anytime"])
+        return _cover(preds), probs.astype(np.float32), used.astype(np.uint16)
+    preds, probs = predict_batch(_worker["model"], _worker["scaler"], _worker["features"], X)
+    return _cover(preds), probs.astype(np.float32), None
+
+
+def _cover(preds):
+    # argmax index -> the model's own label (Cover_Type 1-7 for covtype)
+    return _worker["classes"][preds].astype(np.uint8)
+
+
+def _onehot_columns(path, columns, prefix, n):
+    """The ``n`` one-hot columns named ``prefix*``, ordered by their number."""
+    cols = [c for c in columns if str(c).startswith(prefix)]
+    if len(cols) != n:
+        raise SystemExit(f"{path}: expected {n} {prefix}* columns, found {len(cols)}")
+    return sorted(cols, key=lambda c: int(re.sub(r"\D", "", str(c)) or -1))
+
+
+def read_chunks(path, features, chunksize, header=True):
+    """Yield (N, n_features) float arrays in file order.
+
+    Columns are picked by name, so extra or reordered columns are fine.
+    Compact-encoded models (12 features) still read covtype-schema input:
+    the Wilderness* and Soil* one-hot columns are collapsed per chunk.
+    """
+    compact = len(features) == N_COMPACT
+    base    = features[:N_BASE] if compact else features
+    if header:
+        names = None
+    elif compact:
+        names = (base + [f"Wilderness_{i}" for i in range(N_WILD)]
+                 + [f"Soil_{i}" for i in range(N_SOIL)] + ["Cover_Type"])
+    else:
+        names = features + ["Cover_Type"]
+    cols = None
+    for df in pd.read_csv(path, chunksize=chunksize, header=0 if header else None, names=names):
+        if cols is None:
+            missing = [c for c in base if c not in df.columns]
+            if missing:
+                raise SystemExit(f"{path}: missing feature columns {missing[:5]}"
+                                 f"{' ...' if len(missing) > 5 else ''}")
+            cols = base + (_onehot_columns(path, df.columns, "Wilderness", N_WILD)
+                           + _onehot_columns(path, df.columns, "Soil", N_SOIL) if compact else [])
+        X = df[cols].to_numpy(dtype=np.float64)
+        yield compact_rows(X) if compact else X
+
+
+def _open_out(path):
+    return gzip.open(path, "wt", newline="") if path.endswith(".gz") else open(path, "w", newline="")
+
+
+def _write(out, preds, probs, first, used=None):
+    df = pd.DataFrame(probs, columns=[f"p{i}" for i in range(N_CLASSES)])
+    df.insert(0, "pred", preds)
+    if used is not None:
+        df["trees"] = used
+    df.to_csv(out, header=first, index=False, float_format="%.4f")
+
+
+def _feature_names(args):
+    """Feature names from the manifest or features file, without loading the model."""
+    if args.mmap:
+        with open(os.path.join(args.mmap, "manifest.json")) as f:
+            return json.load(f)["features"]
+    with open(args.features) as f:
+        return json.load(f)
+
+
+def score(args):
+    required = [os.path.join(args.mmap, "manifest.json")] if args.mmap else [args.model, args.features]
+    missing  = [p for p in required if not os.path.exists(p)]
+    if not missing and not args.mmap and args.scaler is not None and not os.path.exists(args.scaler):
+        # only the compact layout (histogram boosting) is trained on raw columns
+        if len(_feature_names(args)) != N_COMPACT:
+            missing.append(f"{args.scaler} (pass --no-scaler if the model takes raw columns)")
+    if missing:
+        print(f"missing model files: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    features = _feature_names(args)
+    init     = (args.model, args.scaler, args.features, args.mmap, args.anytime)
+    chunks   = read_chunks(args.input, features, args.chunksize, header=not args.no_header)
+    # the model is loaded where it scores: in each worker, or here when there are none
+    pool     = ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=init) if args.workers else None
+    if pool is None:
+        _init_worker(*init)
+
+    rows, first, t0 = 0, True, time.perf_counter()
+    with _open_out(args.output) as out:
+        def drain(result):
+            nonlocal rows, first
+            preds, probs, used = result
+            _write(out, preds, probs, first, used)
+            first = False
+            rows += len(preds)
+            rate = rows / (time.perf_counter() - t0)
+            print(f"\r{rows:,} rows  {rate:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+        if pool is None:
+            for X in chunks:
+                drain(_score_chunk(X))
+        else:
+            pending = collections.deque()
+            with pool:
+                for X in chunks:
+                    pending.append(pool.submit(_score_chunk, X))
+                    if len(pending) >= 2 * args.workers:
+                        drain(pending.popleft().result())
+                while pending:
+                    drain(pending.popleft().result())
+
+    elapsed = time.perf_counter() - t0
+    print(f"\nscored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) "
+          f"-> {args.output}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("input", help="CSV or .gz in covtype schema")
+    ap.add_argument("output", help="predictions CSV (.gz to compress)")
+    ap.add_argument("--chunksize", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="scoring processes; 0 scores in the main process")
+    ap.add_argument("--no-header", action="store_true",
+                    help="raw covtype.data layout: feature columns then Cover_Type")
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--scaler", default=SCALER_PATH)
+    ap.add_argument("--no-scaler", dest="scaler", action="store_const", const=None,
+                    help="the model takes raw columns; implied for compact-layout models")
+    ap.add_argument("--features", default=FEATURES_PATH)
+    ap.add_argument("--mmap", metavar="DIR",
+                    help="score a memory-mapped export (artifacts.export_mmap) instead of the pickles")
+    ap.add_argument("--anytime", type=float, metavar="Z",
+                    help="stop each row's trees once its class is Z standard errors settled (e.g. 3)")
+    return score(ap.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Precomputed decision-surface index for the Explore page.
+
+    python surface_index.py build  [--out surface_index] [--steps 60 4 100 500]
+    python surface_index.py report [--index surface_index] [--samples 5000]
+
+The builder scores a lattice over the four swept inputs (elevation, slope,
+H-dist hydrology, H-dist roads) for every wilderness area, with the other
+inputs held at the input_panel defaults. Probabilities are quantised to
+uint8 and stored as one memory-mapped ``.npy``. Explore answers sweeps by
+multilinear interpolation when its baseline matches the fixed inputs; the
+baseline row itself is always scored live.
+"""
+import argparse, itertools, json, os, shutil, sys, time
+
+import numpy as np
+
+from artifacts import load_artifacts, model_stamp, replace_dir
+from inference import N_CLASSES, PARAM_RANGES, WILDERNESS, param_matrix, predict_batch
+
+SURFACE_PATH  = os.environ.get("FORESTIQ_SURFACE", "surface_index")
+AXES          = [0, 2, 3, 5]
+DEFAULT_STEPS = [60, 4, 100, 500]
+# input_panel defaults for everything that is not on a lattice axis
+FIXED         = {1: 180, 4: 30, 6: 1700, 7: 212, 8: 220, 9: 142}
+BUILD_CHUNK   = 65536
+
+
+def axis_values(idx, step):
+    lo, hi = PARAM_RANGES[idx]
+    return np.unique(np.append(np.arange(lo, hi + 1, step), hi)).astype(float)
+
+
+# ── BUILD ──────────────────────────────────────────────────────
+def build(model, scaler, feature_names, out=SURFACE_PATH, steps=DEFAULT_STEPS, stamp=None):
+    axes  = [axis_values(i, s) for i, s in zip(AXES, steps)]
+    shape = (len(WILDERNESS),) + tuple(len(a) for a in axes) + (N_CLASSES,)
+    # built beside ``out`` and swapped in whole: running apps may have the old grid mapped
+    tmp   = f"{out}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    grid  = np.lib.format.open_memmap(os.path.join(tmp, "probs.npy"), mode="w+",
+                                      dtype=np.uint8, shape=shape)
+
+    mesh = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(AXES))
+    rows = np.zeros((len(mesh), 11))
+    for i, v in FIXED.items():
+        rows[:, i] = v
+    rows[:, AXES] = mesh
+    for w in range(len(WILDERNESS)):
+        rows[:, 10] = w
+        flat = grid[w].reshape(-1, N_CLASSES)
+        for a in range(0, len(rows), BUILD_CHUNK):
+            _, p = predict_batch(model, scaler, feature_names, rows[a:a + BUILD_CHUNK])
+            flat[a:a + BUILD_CHUNK] = np.rint(p * 255)
+    grid.flush()
+
+    manifest = dict(version=1, axes=AXES, values=[a.tolist() for a in axes],
+                    fixed={str(k): v for k, v in FIXED.items()},
+                    shape=list(shape), dtype="uint8", scale=255, model_stamp=stamp)
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+    del grid
+    replace_dir(tmp, out)
+    return SurfaceIndex.open(out, stamp)
+
+
+# ── LOOKUP ─────────────────────────────────────────────────────
+class SurfaceIndex:
+
+    def __init__(self, grid, manifest):
+        self.grid   = grid
+        self.axes   = manifest["axes"]
+        self.values = [np.asarray(v) for v in manifest["values"]]
+        self.fixed  = {int(k): v for k, v in manifest["fixed"].items()}
+        self.scale  = float(manifest["scale"])
+        self.stamp  = manifest.get("model_stamp")
+
+    @classmethod
+    def open(cls, path=SURFACE_PATH, stamp=None):
+        """Memory-map an index; ``None`` if it is missing or built for another model."""
+        try:
+            with open(os.path.join(path, "manifest.json")) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get("model_stamp") != stamp:
+            return None
+        return cls(np.load(os.path.join(path, "probs.npy"), mmap_mode="r"), manifest)
+
+    def covers(self, base, sweeps=()):
+        P = param_matrix([base] if not isinstance(base, np.ndarray) else base)[0]
+        if any(P[i] != v for i, v in self.fixed.items()):
+            return False
+        for i, vals in zip(self.axes, self.values):
+            if not vals[0] <= P[i] <= vals[-1]:
+                return False
+        return all(idx in self.axes for idx, _ in sweeps)
+
+    def lookup(self, rows):
+        """Interpolated (N, 7) probabilities for parameter rows on the index."""
+        P   = param_matrix(rows)
+        w   = P[:, 10].astype(int)
+        lo, frac = [], []
+        for i, vals in zip(self.axes, self.values):
+            x = np.clip(P[:, i], vals[0], vals[-1])
+            j = np.clip(np.searchsorted(vals, x, side="right") - 1, 0, len(vals) - 2)
+            lo.append(j)
+            frac.append((x - vals[j]) / (vals[j + 1] - vals[j]))
+        out = np.zeros((len(P), self.grid.shape[-1]))
+        for corner in itertools.product((0, 1), repeat=len(self.axes)):
+            weight = np.ones(len(P))
+            for c, t in zip(corner, frac):
+                weight *= t if c else 1 - t
+            idx = tuple(j + c for j, c in zip(lo, corner))
+            out += weight[:, None] * self.grid[(w,) + idx]
+        return out / self.scale
+
+    def sweeps(self, base, sweeps):
+        """The per-sweep parts of ``inference.predict_sweeps``, answered by lookup.
+
+        There is no baseline entry: an interpolated baseline can name a
+        different class than the model, so callers score that row live.
+        """
+        from inference import sweep_rows
+        probs  = self.lookup(sweep_rows(base, sweeps)[1:])
+        preds  = probs.argmax(axis=1)
+        bounds = np.cumsum([0] + [len(xs) for _, xs in sweeps])
+        # interpolated probabilities carry no per-tree spread
+        return [(preds[a:b], probs[a:b], None) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+# ── REPORT ─────────────────────────────────────────────────────
+def report(index, model, scaler, feature_names, samples=5000, seed=0):
+    rng  = np.random.default_rng(seed)
+    rows = np.zeros((samples, 11))
+    for i, v in index.fixed.items():
+        rows[:, i] = v
+    for i, vals in zip(index.axes, index.values):
+        rows[:, i] = rng.integers(vals[0], vals[-1] + 1, samples)
+    rows[:, 10] = rng.integers(0, len(WILDERNESS), samples)
+
+    t = time.perf_counter(); approx = index.lookup(rows); t_idx = time.perf_counter() - t
+    t = time.perf_counter(); _, live = predict_batch(model, scaler, feature_names, rows)
+    t_live = time.perf_counter() - t
+    err = np.abs(approx - live)
+    return dict(samples=samples, mean_abs_err=float(err.mean()), p99_abs_err=float(np.quantile(err.max(1), .99)),
+                max_abs_err=float(err.max()), class_agreement=float((approx.argmax(1) == live.argmax(1)).mean()),
+                lookup_ms=t_idx * 1e3, live_ms=t_live * 1e3)
+
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="score the lattice and write the index")
+    b.add_argument("--out", default=SURFACE_PATH)
+    b.add_argument("--steps", type=int, nargs=len(AXES), default=DEFAULT_STEPS,
+                   help="lattice step for elevation, slope, h_hydro, h_roads")
+    r = sub.add_parser("report", help="accuracy of the index against live inference")
+    r.add_argument("--index", default=SURFACE_PATH)
+    r.add_argument("--samples", type=int, default=5000)
+    args = ap.parse_args(argv)
+
+    model, scaler, features = load_artifacts()
+    if args.cmd == "build":
+        t = time.perf_counter()
+        idx = build(model, scaler, features, args.out, args.steps, stamp=model_stamp())
+        print(f"built {args.out}: grid {idx.grid.shape} uint8 "
+              f"({idx.grid.nbytes / 1e6:.1f} MB) in {time.perf_counter() - t:.1f}s")
+        return 0
+    idx = SurfaceIndex.open(args.index, model_stamp())
+    if idx is None:
+        print(f"no index for the current model at {args.index}", file=sys.stderr)
+        return 1
+    for k, v in report(idx, model, scaler, features, args.samples).items():
+        print(f"{k:>16}: {v:.4f}" if isinstance(v, float) else f"{k:>16}: {v}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
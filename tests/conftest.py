@@ -0,0 +1,32 @@
+import os, sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from inference import N_ONEHOT, PARAM_RANGES, encode_rows
+
+
+def slider_rows(n, seed=0):
+    """input_panel parameter rows drawn uniformly from the slider ranges."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.integers(lo, hi + 1, n) for lo, hi in PARAM_RANGES]).astype(float)
+
+
+@pytest.fixture(scope="session")
+def forest():
+    """``(model, scaler, features)``: a small forest on scaled one-hot rows, as the notebook builds it."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    X = encode_rows(slider_rows(1500), N_ONEHOT)
+    # elevation bands, nudged by slope and wilderness so more than one column matters
+    y = np.clip((X[:, 0] - 1800) // 300 + (X[:, 2] > 30) - X[:, 11], 0, 6).astype(int)
+    scaler = StandardScaler().fit(X)
+    model  = RandomForestClassifier(n_estimators=12, max_depth=8, random_state=0).fit(scaler.transform(X), y)
+    return model, scaler, [f"f{i}" for i in range(N_ONEHOT)]
+
+
+@pytest.fixture(scope="session")
+def params():
+    """Held-out parameter rows, not seen while fitting ``forest``."""
+    return slider_rows(300, seed=1)
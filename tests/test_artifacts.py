@@ -0,0 +1,22 @@
+import os
+
+import numpy as np
+
+from artifacts import export_mmap, load_mmap
+from forest_engine import CompiledForest
+
+
+def test_export_over_a_mapped_model_leaves_the_mapping_intact(forest, tmp_path):
+    model, scaler, features = forest
+    engine = CompiledForest.from_sklearn(model, scaler)
+    out = str(tmp_path / "mmap")
+    export_mmap(engine, None, features, out)
+    old, _, _ = load_mmap(out)
+    before = np.array(old.threshold)
+
+    export_mmap(engine.prune(n_trees=3), None, features, out)
+    # the running process still reads the arrays it mapped, not a truncated file
+    np.testing.assert_array_equal(old.threshold, before)
+    new, _, _ = load_mmap(out)
+    assert new.n_trees == 3
+    assert sorted(os.listdir(tmp_path)) == ["mmap"]
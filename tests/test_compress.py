@@ -0,0 +1,26 @@
+import argparse
+
+import numpy as np
+
+from compress import candidates, served
+from inference import N_ONEHOT, _pad_classes, encode_rows
+
+
+def test_candidates_keep_the_teachers_class_columns(forest):
+    from conftest import slider_rows
+    model, scaler, _ = forest
+    teacher = served(model, scaler)
+    X = encode_rows(slider_rows(2000, seed=2), N_ONEHOT)
+    y = teacher[0].predict(X)
+    # fit rows without the teacher's first class: a refit model has no column for it
+    missing = model.classes_[0]
+    X_fit, y_fit = X[y != missing], y[y != missing]
+    args = argparse.Namespace(trees=[], depths=[], topk=[20], topk_depth=8, distill_depths=[8], seed=0)
+    names = set()
+    for name, _, cand in candidates(args, model, scaler, X_fit, y_fit, teacher):
+        names.add(name)
+        np.testing.assert_array_equal(cand.classes_, model.classes_)
+        probs = _pad_classes(cand.predict_proba(X_fit))
+        # the app reads labels straight off the argmax index
+        assert (model.classes_[probs.argmax(axis=1)] == y_fit).mean() > 0.8, name
+    assert names == {"top20", "distilled-depth8"}
@@ -0,0 +1,60 @@
+import numpy as np
+
+from forest_engine import CompiledForest
+from inference import N_ONEHOT, encode_rows
+
+
+def _depths(tree):
+    depth = np.zeros(tree.node_count, dtype=int)
+    for n in range(tree.node_count):
+        for c in (tree.children_left[n], tree.children_right[n]):
+            if c != -1:
+                depth[c] = depth[n] + 1
+    return depth
+
+
+def test_folded_scaler_matches_sklearn_on_raw_rows(forest, params):
+    model, scaler, _ = forest
+    X = encode_rows(params, N_ONEHOT)
+    engine = CompiledForest.from_sklearn(model, scaler)
+    ref = model.predict_proba(scaler.transform(X))
+    np.testing.assert_allclose(engine.predict_proba(X), ref, atol=1e-6)
+    np.testing.assert_array_equal(engine.predict(X), model.predict(scaler.transform(X)))
+
+
+def test_prune_keeps_the_first_trees(forest, params):
+    model, scaler, _ = forest
+    X  = encode_rows(params, N_ONEHOT)
+    Xs = scaler.transform(X)
+    pruned = CompiledForest.from_sklearn(model, scaler).prune(n_trees=5)
+    ref = np.mean([t.predict_proba(Xs) for t in model.estimators_[:5]], axis=0)
+    assert pruned.n_trees == 5
+    np.testing.assert_allclose(pruned.predict_proba(X), ref, atol=1e-6)
+
+
+def test_prune_at_depth_answers_with_the_cut_node(forest, params):
+    model, scaler, _ = forest
+    X  = encode_rows(params, N_ONEHOT)
+    Xs = scaler.transform(X)
+    full   = CompiledForest.from_sklearn(model.estimators_[0], scaler)
+    pruned = full.prune(max_depth=3)
+    assert pruned.max_depth == 3 and len(pruned.feature) < len(full.feature)
+
+    tree  = model.estimators_[0].tree_
+    depth = _depths(tree)
+    path  = model.estimators_[0].decision_path(Xs.astype(np.float32)).toarray().astype(bool)
+    # deepest node on each row's path that is still within the cut
+    node  = np.where(path & (depth <= 3), depth, -1).argmax(axis=1)
+    value = tree.value[node, 0]
+    np.testing.assert_allclose(pruned.predict_proba(X), value / value.sum(axis=1, keepdims=True), atol=1e-6)
+
+
+def test_remap_features_reads_full_width_rows(params):
+    from sklearn.ensemble import RandomForestClassifier
+    X    = encode_rows(params, N_ONEHOT)
+    y    = (X[:, 0] > 2800).astype(int) + (X[:, 5] > 3500)
+    cols = np.array([0, 2, 5, 12])
+    rf   = RandomForestClassifier(n_estimators=5, max_depth=6, random_state=0).fit(X[:, cols], y)
+    wide = CompiledForest.from_sklearn(rf).remap_features(cols, N_ONEHOT)
+    assert wide.n_features_in_ == N_ONEHOT
+    np.testing.assert_allclose(wide.predict_proba(X), rf.predict_proba(X[:, cols]), atol=1e-6)
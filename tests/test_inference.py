@@ -0,0 +1,186 @@
+import numpy as np
+
+from forest_engine import CompiledForest
+from inference import (ATTR_INPUTS, N_CLASSES, N_ONEHOT, WILDERNESS, PredictionCache, SweepPrefetcher, encode_rows,
+                       find_boundaries, predict_anytime, predict_batch, predict_contributions, predict_spread,
+                       predict_sweeps, rows_scored, sweep_rows, tree_votes, vote_spread)
+
+
+def test_predict_batch_matches_the_estimator(forest, params):
+    model, scaler, features = forest
+    preds, probs = predict_batch(model, scaler, features, params)
+    ref = model.predict_proba(scaler.transform(encode_rows(params, N_ONEHOT)))
+    assert probs.shape == (len(params), N_CLASSES)
+    np.testing.assert_allclose(probs[:, :ref.shape[1]], ref)
+    np.testing.assert_array_equal(preds, probs.argmax(axis=1))
+
+
+def test_predict_batch_takes_named_wilderness_and_encoded_rows(forest, params):
+    model, scaler, features = forest
+    named = [tuple(r[:10]) + (WILDERNESS[int(r[10])],) for r in params[:20]]
+    _, a = predict_batch(model, scaler, features, named)
+    _, b = predict_batch(model, scaler, features, params[:20])
+    _, c = predict_batch(model, scaler, features, encode_rows(params[:20], N_ONEHOT))
+    np.testing.assert_array_equal(a, b)
+    np.testing.assert_array_equal(b, c)
+
+
+def test_predict_sweeps_splits_one_call_into_baseline_and_sweeps(forest, params):
+    model, scaler, features = forest
+    base   = params[0]
+    sweeps = [(0, np.arange(1800, 3901, 300)), (2, np.arange(0, 53, 13))]
+    (pred, probs, spread), parts = predict_sweeps(model, scaler, features, base, sweeps)
+    ref_preds, ref = predict_batch(model, scaler, features, sweep_rows(base, sweeps))
+    assert pred == ref_preds[0] and spread is None
+    np.testing.assert_array_equal(probs, ref[0])
+    assert [len(p) for p, _, _ in parts] == [len(xs) for _, xs in sweeps]
+    np.testing.assert_array_equal(np.vstack([p for _, p, _ in parts]), ref[1:])
+    # each sweep varies only its own input
+    for (idx, xs), (_, p, _) in zip(sweeps, parts):
+        rows = np.repeat(base[None], len(xs), axis=0)
+        rows[:, idx] = xs
+        np.testing.assert_array_equal(p, predict_batch(model, scaler, features, rows)[1])
+
+
+def test_prediction_cache_evicts_least_recent_and_rebinds():
+    cache = PredictionCache(maxsize=2)
+    cache.bind("model-a")
+    cache.put("x", np.zeros(3))
+    cache.put("y", np.ones(3))
+    assert cache.get("x") is not None          # x is now the most recent
+    cache.put("z", np.ones(3))
+    assert cache.get("y") is None and cache.get("x") is not None
+    assert cache.stats()["evictions"] == 1
+    assert not cache.get("z").flags.writeable
+    cache.bind("model-a")
+    assert cache.get("z") is not None
+    cache.bind("model-b")
+    assert cache.get("z") is None and cache.stats()["size"] == 0
+
+
+def test_predict_batch_with_cache_scores_only_new_rows(forest, params):
+    model, scaler, features = forest
+    cache = PredictionCache()
+    _, first = predict_batch(model, scaler, features, params[:10], cache=cache)
+    assert cache.stats()["misses"] == 10
+    _, again = predict_batch(model, scaler, features, params[5:15], cache=cache)
+    assert cache.stats()["hits"] == 5 and cache.stats()["misses"] == 15
+    np.testing.assert_array_equal(again[:5], first[5:])
+    np.testing.assert_array_equal(again, predict_batch(model, scaler, features, params[5:15])[1])
+
+
+def test_find_boundaries_lands_on_brute_force_transitions(forest, params):
+    model, scaler, features = forest
+    base = params[3]
+    axes = ((0, 1800, 3900), (2, 0, 52))
+    segments, rows, rounds = find_boundaries(model, scaler, features, base, axes, coarse=8, tol=1)
+    assert rounds > 1
+    for (idx, lo, hi), runs in zip(axes, segments):
+        xs = np.arange(lo, hi + 1)
+        P  = np.repeat(base[None], len(xs), axis=0)
+        P[:, idx] = xs
+        truth = dict(zip(xs.tolist(), predict_batch(model, scaler, features, P)[0].tolist()))
+        assert runs[0][0] == lo and runs[-1][1] == hi
+        for start, end, cls in runs:
+            assert truth[start] == cls and truth[end] == cls
+        # every reported transition is a one-unit gap where the class really changes
+        for a, b in zip(runs[:-1], runs[1:]):
+            assert b[0] - a[1] == 1 and truth[a[1]] != truth[b[0]]
+    assert rows < sum(hi - lo + 1 for _, lo, hi in axes)
+
+
+def test_predict_anytime_without_a_stop_rule_is_the_full_forest(forest, params):
+    model, scaler, features = forest
+    preds, probs, used, err = predict_anytime(model, scaler, features, params, z=None, chunk=4)
+    ref_preds, ref = predict_batch(model, scaler, features, params)
+    assert (used == len(model.estimators_)).all() and (err == 0).all()
+    np.testing.assert_allclose(probs, ref, atol=1e-12)
+    np.testing.assert_array_equal(preds, ref_preds)
+
+
+def test_predict_anytime_stops_settled_rows_early_on_either_engine(forest, params):
+    model, scaler, features = forest
+    engine = CompiledForest.from_sklearn(model, scaler)
+    preds, probs, used, _ = predict_anytime(model, scaler, features, params, z=1.0, chunk=4)
+    c_preds, c_probs, c_used, _ = predict_anytime(engine, None, features, params, z=1.0, chunk=4)
+    assert used.min() < len(model.estimators_) <= used.max()
+    np.testing.assert_array_equal(used, c_used)
+    np.testing.assert_allclose(probs, c_probs, atol=1e-6)
+    full = predict_batch(model, scaler, features, params)[0]
+    assert (preds == full).mean() > 0.9
+
+
+def test_vote_spread_summarises_the_tree_axis():
+    agree = np.tile([[[0.2, 0.8]]], (5, 1, 1))
+    probs, (std, lo, hi) = vote_spread(agree)
+    np.testing.assert_allclose(probs, agree[0])
+    np.testing.assert_allclose(std, 0, atol=1e-12)
+    np.testing.assert_allclose(lo, hi)
+    split = np.array([[[1.0, 0.0]], [[0.0, 1.0]]])
+    probs, (std, lo, hi) = vote_spread(split, quantiles=(0.0, 1.0))
+    np.testing.assert_allclose(probs, [[0.5, 0.5]])
+    np.testing.assert_allclose(std, [[0.5, 0.5]])
+    np.testing.assert_allclose(lo, [[0.0, 0.0]])
+    np.testing.assert_allclose(hi, [[1.0, 1.0]])
+
+
+def test_predict_spread_means_are_the_forest_probabilities(forest, params):
+    model, scaler, features = forest
+    X = encode_rows(params, N_ONEHOT)
+    votes = tree_votes(model, scaler, X)
+    assert votes.shape[0] == len(model.estimators_)
+    preds, probs, (std, lo, hi) = predict_spread(model, scaler, features, params)
+    np.testing.assert_allclose(probs, predict_batch(model, scaler, features, params)[1], atol=1e-12)
+    np.testing.assert_allclose(std[:, :votes.shape[2]], votes.std(axis=0), atol=1e-12)
+    assert (lo <= hi).all()
+
+
+def test_contributions_add_up_to_the_prediction(forest, params):
+    model, scaler, features = forest
+    engine = CompiledForest.from_sklearn(model, scaler)
+    probs, bias, contrib = predict_contributions(engine, features, params)
+    assert contrib.shape == (len(params), len(ATTR_INPUTS), N_CLASSES)
+    np.testing.assert_allclose(bias + contrib.sum(axis=1), probs, atol=1e-6)
+    np.testing.assert_allclose(probs, predict_batch(engine, None, features, params)[1], atol=1e-6)
+
+
+def test_contributions_go_only_to_the_inputs_the_trees_split_on(params):
+    from sklearn.ensemble import RandomForestClassifier
+    X  = encode_rows(params, N_ONEHOT)
+    rf = RandomForestClassifier(n_estimators=4, max_depth=4, random_state=0).fit(X[:, [0]], X[:, 0] > 2800)
+    engine = CompiledForest.from_sklearn(rf).remap_features([0], N_ONEHOT)
+    _, _, contrib = predict_contributions(engine, [f"f{i}" for i in range(N_ONEHOT)], params)
+    assert np.abs(contrib[:, 0]).sum() > 0
+    np.testing.assert_array_equal(contrib[:, 1:], 0)
+
+
+def test_prefetcher_does_not_wait_behind_other_sessions():
+    import threading, time
+    gate, pf = threading.Event(), SweepPrefetcher(workers=1)
+    try:
+        busy, mine = {}, {}
+        pf.submit(busy, "other", gate.wait, 10)
+        pf.submit(mine, "k", lambda: "sweeps")
+        t = time.perf_counter()
+        assert pf.result(mine, "k") is None
+        assert time.perf_counter() - t < 1
+        assert "sweep_job" not in mine and pf.stats()["cancelled"] == 1
+        gate.set()
+        started = threading.Event()
+        pf.submit(mine, "k", lambda: (started.set(), time.sleep(.05), "sweeps")[-1])
+        started.wait(10)
+        assert pf.result(mine, "k") == "sweeps"
+    finally:
+        gate.set()
+        pf.pool.shutdown(wait=True)
+
+
+def test_rows_scored_counts_only_rows_sent_to_the_model(forest, params):
+    model, scaler, features = forest
+    cache = PredictionCache(maxsize=1000)
+    start = rows_scored()
+    predict_batch(model, scaler, features, params[:50], cache=cache)
+    predict_batch(model, scaler, features, params[:80], cache=cache)
+    assert rows_scored() - start == 80
+    predict_spread(model, scaler, features, params[:10])
+    assert rows_scored() - start == 90
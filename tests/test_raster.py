@@ -0,0 +1,54 @@
+import os, sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from raster import DEFAULTS, LAYERS, layer, tile_params
+
+
+def _params(elev, tile):
+    H, W = elev.shape
+    layers = {name: layer(DEFAULTS[name], elev.shape, name) for name in LAYERS + ["wilderness"]}
+    P = np.empty((H, W, 11))
+    valid = np.empty((H, W), dtype=bool)
+    for r0 in range(0, H, tile):
+        for c0 in range(0, W, tile):
+            r1, c1 = min(r0 + tile, H), min(c0 + tile, W)
+            p, v = tile_params(elev, layers, r0, r1, c0, c1, 30.0)
+            P[r0:r1, c0:c1] = p.reshape(r1 - r0, c1 - c0, -1)
+            valid[r0:r1, c0:c1] = v.reshape(r1 - r0, c1 - c0)
+    return P, valid
+
+
+def test_tile_size_does_not_change_terrain_near_nodata():
+    rng  = np.random.default_rng(0)
+    elev = 2500 + np.cumsum(rng.normal(0, 5, (40, 40)), axis=1)
+    elev[12:15, :] = np.nan
+    elev[30, 30]   = np.nan
+    P7, v7   = _params(elev, 7)
+    P40, v40 = _params(elev, 40)
+    np.testing.assert_array_equal(v7, v40)
+    np.testing.assert_allclose(P7[v7], P40[v40])
+    assert np.isfinite(P7[v7]).all()
+    # the nodata band and every cell whose stencil touches it are masked
+    assert not v7[11:16].any() and v7[10].all() and v7[16].all()
+    assert not v7[29:32, 29:32].any()
+
+
+def test_class_grid_holds_the_models_labels(tmp_path):
+    from sklearn.ensemble import RandomForestClassifier
+    from inference import N_ONEHOT, encode_rows
+    from raster import NODATA_CLASS, score_grid
+    rng  = np.random.default_rng(1)
+    elev = 2000 + np.cumsum(rng.normal(0, 40, (30, 30)), axis=0)
+    elev[5, :] = np.nan
+    P, valid = _params(elev, 30)
+    X = encode_rows(P[valid].reshape(-1, 11), N_ONEHOT)
+    # Cover_Type-style labels 1-3, so an argmax index would be off by one
+    y = 1 + np.digitize(X[:, 0], np.quantile(X[:, 0], [1 / 3, 2 / 3]))
+    rf = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    features = [f"f{i}" for i in range(N_ONEHOT)]
+    layers = {name: layer(DEFAULTS[name], elev.shape, name) for name in LAYERS + ["wilderness"]}
+    classes, _ = score_grid(rf, None, features, elev, layers, str(tmp_path), 30.0, tile=8)
+    assert (classes[~valid] == NODATA_CLASS).all()
+    np.testing.assert_array_equal(classes[valid], rf.predict(X))
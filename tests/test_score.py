@@ -0,0 +1,42 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference import N_ONEHOT, encode_rows
+from score import main
+
+
+@pytest.fixture
+def files(forest, params, tmp_path):
+    model, scaler, features = forest
+    paths = {k: str(tmp_path / n) for k, n in
+             (("model", "m.pkl"), ("scaler", "s.pkl"), ("features", "f.json"), ("input", "in.csv"))}
+    joblib.dump(model, paths["model"])
+    joblib.dump(scaler, paths["scaler"])
+    with open(paths["features"], "w") as f:
+        json.dump(features, f)
+    pd.DataFrame(encode_rows(params, N_ONEHOT), columns=features).to_csv(paths["input"], index=False)
+    return paths
+
+
+def run(files, out, *extra):
+    return main([files["input"], out, "--model", files["model"], "--features", files["features"],
+                 "--chunksize", "128", *extra])
+
+
+def test_scores_with_the_scaler_in_workers_and_inline(forest, params, files, tmp_path):
+    model, scaler, _ = forest
+    expected = model.classes_[model.predict_proba(scaler.transform(encode_rows(params, N_ONEHOT))).argmax(1)]
+    for workers in ("0", "2"):
+        out = str(tmp_path / f"out{workers}.csv")
+        assert run(files, out, "--scaler", files["scaler"], "--workers", workers) == 0
+        np.testing.assert_array_equal(pd.read_csv(out)["pred"], expected)
+
+
+def test_a_missing_scaler_is_an_error(files, tmp_path, capsys):
+    assert run(files, str(tmp_path / "out.csv"), "--scaler", str(tmp_path / "typo.pkl"), "--workers", "0") == 2
+    assert "typo.pkl" in capsys.readouterr().err
+    assert run(files, str(tmp_path / "out.csv"), "--no-scaler", "--workers", "0") == 0
@@ -0,0 +1,32 @@
+import numpy as np
+
+from inference import predict_batch, sweep_rows
+from surface_index import SurfaceIndex, axis_values, build
+
+STEPS = [700, 26, 700, 3500]
+
+
+def test_sweeps_match_live_inference_on_the_lattice(forest, tmp_path):
+    model, scaler, features = forest
+    build(model, scaler, features, str(tmp_path / "idx"), STEPS, stamp="s")
+    index = SurfaceIndex.open(str(tmp_path / "idx"), "s")
+    # the fixed inputs at their FIXED values, slope and h_hydro on lattice points
+    base  = np.array([2500, 180, 26, 700, 30, 3500, 1700, 212, 220, 142, 0], dtype=float)
+    sweeps = [(0, axis_values(0, 700)), (5, axis_values(5, 3500))]
+    assert index.covers(base, sweeps)
+    parts = index.sweeps(base, sweeps)
+    assert [len(p[1]) for p in parts] == [len(xs) for _, xs in sweeps]
+    _, live = predict_batch(model, scaler, features, sweep_rows(base, sweeps)[1:])
+    np.testing.assert_allclose(np.concatenate([p[1] for p in parts]), live, atol=.5 / 255 + 1e-9)
+
+
+def test_rebuild_leaves_a_mapped_index_intact(forest, tmp_path):
+    model, scaler, features = forest
+    out = str(tmp_path / "idx")
+    build(model, scaler, features, out, STEPS, stamp="a")
+    old = SurfaceIndex.open(out, "a")
+    before = np.array(old.grid)
+    build(model, scaler, features, out, [350, 13, 350, 1750], stamp="b")
+    np.testing.assert_array_equal(old.grid, before)
+    assert SurfaceIndex.open(out, "a") is None
+    assert SurfaceIndex.open(out, "b").grid.shape[1] > before.shape[1]
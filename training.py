@@ -0,0 +1,134 @@
+"""Full-data training for the ForestIQ artifacts.
+
+    python training.py compare covtype.csv             # RF vs histogram boosting: wall-clock + accuracy
+    python training.py fit covtype.csv --model hgb     # train and write the app artifacts
+    python training.py fit covtype.csv --model rf --params tuning/best-rf.json
+
+Histogram gradient boosting bins every feature into at most 255 uint8
+buckets once, then grows trees over bin histograms instead of sorted
+float columns. It trains on the compact 12-column layout with Wilderness
+and Soil as native categoricals and needs no scaler. That makes training
+on all 581k rows routine, where the notebook's random forest is too slow
+for the retraining window.
+"""
+import argparse, json, os, sys, time
+
+import numpy as np
+
+from artifacts import FEATURES_PATH, MODEL_PATH, SCALER_PATH, save_pickle
+from covtype_data import load_cached
+from inference import N_BASE
+
+# The notebook's random forest, for comparison
+RF_PARAMS  = dict(n_estimators=100, max_depth=20, random_state=42, n_jobs=-1)
+HGB_PARAMS = dict(max_iter=300, learning_rate=0.15, max_leaf_nodes=63, max_bins=255,
+                  early_stopping=True, validation_fraction=0.1, n_iter_no_change=10,
+                  random_state=42)
+
+
+def fit_hist_gb(X, y, **params):
+    """Histogram boosting on compact rows; columns 10 and 11 are categorical."""
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    model = HistGradientBoostingClassifier(categorical_features=[N_BASE, N_BASE + 1],
+                                           **{**HGB_PARAMS, **params})
+    return model.fit(X, y)
+
+
+def fit_forest(X, y, **params):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**{**RF_PARAMS, **params}).fit(X, y)
+
+
+# name -> (fit function, layout); onehot rows go through a scaler as in the notebook
+MODELS = {"rf": (fit_forest, "onehot"), "hgb": (fit_hist_gb, "compact")}
+
+
+def design_matrix(data, layout, rows):
+    if layout == "compact":
+        return data.compact_matrix(rows), data.compact_names
+    return data.matrix(rows=rows), data.feature_names
+
+
+def train(data, name, train_idx, **params):
+    """Fit one model; returns ``(model, scaler, features, fit_seconds)``."""
+    fit, layout = MODELS[name]
+    X, features = design_matrix(data, layout, train_idx)
+    y = data.target[train_idx]
+    scaler = None
+    if layout == "onehot":
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler().fit(X)
+        X = scaler.transform(X)
+    t = time.perf_counter()
+    model = fit(X, y, **params)
+    return model, scaler, features, time.perf_counter() - t
+
+
+def evaluate(data, model, scaler, name, test_idx):
+    """``(accuracy, predict_seconds)`` on the held-out rows."""
+    X, _ = design_matrix(data, MODELS[name][1], test_idx)
+    if scaler is not None:
+        X = scaler.transform(X)
+    t = time.perf_counter()
+    preds = model.predict(X)
+    return float((preds == data.target[test_idx]).mean()), time.perf_counter() - t
+
+
+def train_test_rows(data, sample, seed):
+    train_idx, test_idx = data.split(test_size=0.2, seed=seed)
+    if sample:
+        rng = np.random.default_rng(seed)
+        train_idx = np.sort(rng.choice(train_idx, min(sample, len(train_idx)), replace=False))
+    return np.asarray(train_idx), np.asarray(test_idx)
+
+
+def compare(args):
+    data = load_cached(args.data)
+    train_idx, test_idx = train_test_rows(data, args.sample, args.seed)
+    print(f"{len(train_idx):,} train rows, {len(test_idx):,} test rows")
+    print(f"{'model':>5} {'features':>9} {'fit s':>8} {'predict s':>10} {'accuracy':>9}")
+    for name in args.models:
+        model, scaler, features, fit_s = train(data, name, train_idx)
+        acc, pred_s = evaluate(data, model, scaler, name, test_idx)
+        print(f"{name:>5} {len(features):>9} {fit_s:>8.1f} {pred_s:>10.2f} {acc:>9.4f}")
+    return 0
+
+
+def fit(args):
+    data = load_cached(args.data)
+    train_idx, test_idx = train_test_rows(data, args.sample, args.seed)
+    params = {}
+    if args.params:
+        params = json.loads(open(args.params).read() if os.path.exists(args.params) else args.params)
+    model, scaler, features, fit_s = train(data, args.model, train_idx, **params)
+    acc, _ = evaluate(data, model, scaler, args.model, test_idx)
+    save_pickle(model, scaler, features, args.out_model, args.out_scaler, args.out_features)
+    print(f"{args.model}: fit {fit_s:.1f}s on {len(train_idx):,} rows, held-out accuracy {acc:.4f} "
+          f"-> {args.out_model}")
+    return 0
+
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("compare", help="wall-clock and accuracy of each model on the same split")
+    p.add_argument("data", help="covtype.csv or covtype.data[.gz]")
+    p.add_argument("--models", nargs="+", choices=list(MODELS), default=["rf", "hgb"])
+    p.set_defaults(fn=compare)
+    p = sub.add_parser("fit", help="train one model and write forest_model.pkl and friends")
+    p.add_argument("data", help="covtype.csv or covtype.data[.gz]")
+    p.add_argument("--model", choices=list(MODELS), default="hgb")
+    p.add_argument("--params", help="JSON dict or file of estimator parameters (e.g. tuning/best-rf.json)")
+    p.add_argument("--out-model", default=MODEL_PATH)
+    p.add_argument("--out-scaler", default=SCALER_PATH)
+    p.add_argument("--out-features", default=FEATURES_PATH)
+    p.set_defaults(fn=fit)
+    for p in sub.choices.values():
+        p.add_argument("--sample", type=int, help="train on a random subset of the training split")
+        p.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
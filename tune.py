@@ -0,0 +1,175 @@
+"""Stratified cross-validated grid search on a process pool.
+
+    python tune.py covtype.csv --model rf --folds 5 --workers 32
+    python tune.py covtype.csv --model hgb --grid '{"learning_rate": [0.1, 0.2]}'
+
+The design matrix and labels are written once as ``.npy`` under ``--out``.
+Every worker memory-maps them, so all processes share one page-cache copy
+instead of receiving a pickled array per task. Each (parameters, fold)
+result is written to its own JSON file as soon as it finishes, and a
+rerun with the same data and settings skips those. An interrupted search
+resumes where it stopped. Results are keyed by the source checksum, so a
+new data file starts a fresh search.
+"""
+import argparse, hashlib, itertools, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from covtype_data import load_cached
+from training import MODELS, design_matrix, train_test_rows
+
+# Searched around the notebook's hand-picked n_estimators=100, max_depth=20
+GRIDS = {
+    "rf":  dict(n_estimators=[100, 200], max_depth=[20, 30, None], max_features=["sqrt", 0.3]),
+    "hgb": dict(learning_rate=[0.1, 0.2], max_leaf_nodes=[63, 127, 255], l2_regularization=[0.0, 1.0]),
+}
+
+_worker = {}
+
+
+def param_grid(grid):
+    keys = sorted(grid)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+
+
+def task_key(params, fold, stamp):
+    blob = json.dumps(dict(params=params, fold=fold, **stamp), sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+# ── SHARED DATA ────────────────────────────────────────────────
+def prepare(args):
+    """Write X.npy, y.npy and folds.npy once; returns the search stamp."""
+    data = load_cached(args.data)
+    with open(os.path.join(data.cache_dir, "manifest.json")) as f:
+        sha = json.load(f)["sha256"]
+    stamp = dict(data=sha, model=args.model, folds=args.folds, seed=args.seed, sample=args.sample)
+    meta  = os.path.join(args.out, "data.json")
+    if os.path.exists(meta):
+        with open(meta) as f:
+            if json.load(f) == stamp:
+                return stamp
+        # stale stamp goes first, so an interrupted rewrite is never trusted
+        os.remove(meta)
+
+    train_idx, _ = train_test_rows(data, args.sample, args.seed)
+    X, _ = design_matrix(data, MODELS[args.model][1], train_idx)
+    y    = np.asarray(data.target[train_idx])
+    from sklearn.model_selection import StratifiedKFold
+    folds = np.empty(len(y), dtype=np.int8)
+    skf   = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=args.seed)
+    for k, (_, test) in enumerate(skf.split(np.zeros(len(y)), y)):
+        folds[test] = k
+    for name, arr in (("X", X), ("y", y), ("folds", folds)):
+        np.save(os.path.join(args.out, f"{name}.npy"), arr)
+    # written last: its presence marks complete shared arrays
+    with open(meta, "w") as f:
+        json.dump(stamp, f)
+    return stamp
+
+
+def _init_worker(out, model):
+    # one process per core already: keep BLAS / OpenMP inside each fit single-threaded
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+    _worker.update({name: np.load(os.path.join(out, f"{name}.npy"), mmap_mode="r")
+                    for name in ("X", "y", "folds")})
+    _worker.update(out=out, fit=MODELS[model][0], model=model)
+
+
+def _run_fold(key, params, fold):
+    X, y, folds = _worker["X"], _worker["y"], _worker["folds"]
+    train, test = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+    # the pool already uses every core; this overrides any n_jobs in the grid
+    extra = dict(n_jobs=1) if _worker["model"] == "rf" else {}
+    t = time.perf_counter()
+    model = _worker["fit"](X[train], y[train], **{**params, **extra})
+    fit_s = time.perf_counter() - t
+    acc   = float((model.predict(X[test]) == y[test]).mean())
+    result = dict(params=params, fold=fold, accuracy=acc, fit_s=fit_s)
+    path = os.path.join(_worker["out"], "results", f"{key}.json")
+    with open(f"{path}.tmp-{os.getpid()}", "w") as f:
+        json.dump(result, f)
+    os.replace(f"{path}.tmp-{os.getpid()}", path)
+    return result
+
+
+def load_results(out):
+    results = []
+    for name in os.listdir(os.path.join(out, "results")):
+        if name.endswith(".json"):
+            with open(os.path.join(out, "results", name)) as f:
+                results.append((name[:-5], json.load(f)))
+    return dict(results)
+
+
+# ── SEARCH ─────────────────────────────────────────────────────
+def summarize(grid, results, stamp, folds):
+    rows = []
+    for params in grid:
+        got = [results[k] for k in (task_key(params, f, stamp) for f in range(folds)) if k in results]
+        if got:
+            accs = [r["accuracy"] for r in got]
+            rows.append(dict(params=params, folds=len(got), mean=float(np.mean(accs)),
+                             std=float(np.std(accs)), fit_s=float(np.mean([r["fit_s"] for r in got]))))
+    return sorted(rows, key=lambda r: -r["mean"])
+
+
+def search(args):
+    os.makedirs(os.path.join(args.out, "results"), exist_ok=True)
+    grid = GRIDS[args.model] if args.grid is None else json.loads(args.grid)
+    grid = param_grid(grid)
+    stamp = prepare(args)
+
+    done  = load_results(args.out)
+    tasks = [(task_key(p, f, stamp), p, f) for p in grid for f in range(args.folds)]
+    todo  = [t for t in tasks if t[0] not in done]
+    print(f"{len(grid)} parameter sets x {args.folds} folds: {len(tasks) - len(todo)} cached, "
+          f"{len(todo)} to run on {args.workers} workers", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    if todo and args.workers:
+        with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                 initargs=(args.out, args.model)) as pool:
+            futures = [pool.submit(_run_fold, *t) for t in todo]
+            for n, fut in enumerate(as_completed(futures), 1):
+                r = fut.result()
+                print(f"[{n}/{len(todo)}] fold {r['fold']} {r['params']}: {r['accuracy']:.4f} "
+                      f"({r['fit_s']:.1f}s)", file=sys.stderr)
+    elif todo:
+        _init_worker(args.out, args.model)
+        for n, t in enumerate(todo, 1):
+            r = _run_fold(*t)
+            print(f"[{n}/{len(todo)}] fold {r['fold']} {r['params']}: {r['accuracy']:.4f}", file=sys.stderr)
+    if todo:
+        print(f"ran {len(todo)} fits in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    rows = summarize(grid, load_results(args.out), stamp, args.folds)
+    print(f"{'mean':>7} {'std':>7} {'folds':>5} {'fit s':>7}  params")
+    for r in rows:
+        print(f"{r['mean']:>7.4f} {r['std']:>7.4f} {r['folds']:>5} {r['fit_s']:>7.1f}  {json.dumps(r['params'])}")
+    if rows:
+        best = os.path.join(args.out, f"best-{args.model}.json")
+        with open(best, "w") as f:
+            json.dump(rows[0]["params"], f, indent=1)
+        print(f"best -> {best}  (python training.py fit {args.data} --model {args.model} --params {best})")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("data", help="covtype.csv or covtype.data[.gz]")
+    ap.add_argument("--model", choices=list(MODELS), default="rf")
+    ap.add_argument("--grid", help='JSON dict of parameter lists, e.g. \'{"max_depth": [20, 30]}\'')
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="fitting processes; 0 runs in the main process")
+    ap.add_argument("--sample", type=int, help="search on a random subset of the training split")
+    ap.add_argument("--out", default="tuning", help="shared arrays, per-fold results, best-<model>.json")
+    ap.add_argument("--seed", type=int, default=42)
+    return search(ap.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())